@@ -0,0 +1,181 @@
+from collections import deque
+
+##############################
+#   Aho-Corasick automaton   #
+##############################
+"""
+Matches many keywords in a single left-to-right pass over the input
+Cost depends on the length of the input, not on the number of keywords
+Unlike an alternation like r"one|two|...", overlapping hits can be reported
+e.g. "oneight" -> one (0, 3) and eight (2, 7)
+Every character goes through a Python loop, so for a handful of keywords
+(like the nine digit words in aoc.py) a re alternation is much faster
+The automaton pays off with many keywords, where re tries the alternatives
+one after another at each position, see benchmark()
+"""
+
+
+class KeywordMatcher:
+    """Match the keys of a mapping (or an iterable of keywords) in one pass.
+
+    Matches are reported as (start, end, value) triples, where value is the
+    mapping value for the keyword (or the keyword itself for an iterable).
+    """
+
+    def __init__(self, keywords):
+        if not hasattr(keywords, "items"):
+            keywords = {k: k for k in keywords}
+        if not keywords or any(not k for k in keywords):
+            raise ValueError("keywords must be a non-empty collection of non-empty strings")
+
+        # Trie: goto[state] maps a character to the next state
+        goto = [{}]
+        out = [[]]
+        for key, value in keywords.items():
+            state = 0
+            for ch in key:
+                if ch not in goto[state]:
+                    goto.append({})
+                    out.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            out[state] = [(len(key), value)]
+
+        # Breadth first walk to resolve failure links into a full transition
+        # table, so matching never has to follow failure links at run time
+        # Transitions back to the root state are left out to keep it sparse
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                delta[state][ch] = nxt
+                queue.append(nxt)
+            # Longest keyword first, then shorter ones found via failure link
+            out[state] = out[state] + out[fail[state]]
+
+        self._delta = delta
+        self._out = out
+        self._keywords = keywords
+        self._reverse = None
+        self.maxlen = max(len(k) for k in keywords)
+
+    def _overlapped(self, text):
+        delta = self._delta
+        out = self._out
+        state = 0
+        for i, ch in enumerate(text, 1):
+            state = delta[state].get(ch, 0)
+            for length, value in out[state]:
+                yield i - length, i, value
+
+    def finditer(self, text, overlapped=False):
+        """Yield (start, end, value) for keywords found in text.
+
+        With overlapped=False, matches are leftmost-longest and do not overlap
+        With overlapped=True, every occurrence of every keyword is reported
+        Matches are yielded in order of their end position
+        """
+        if overlapped:
+            yield from self._overlapped(text)
+            return
+
+        # A match can be committed once no future match can start at or
+        # before it, i.e. once the scan is maxlen characters past its start
+        maxlen = self.maxlen
+        pending = []
+        last_end = 0
+        for start, end, value in self._overlapped(text):
+            if start >= last_end:
+                pending.append((start, end, value))
+            threshold = end + 1 - maxlen
+            while pending:
+                best = min(pending, key=lambda m: (m[0], -m[1]))
+                if best[0] >= threshold:
+                    break
+                yield best
+                last_end = best[1]
+                pending = [m for m in pending if m[0] >= last_end]
+        while pending:
+            best = min(pending, key=lambda m: (m[0], -m[1]))
+            yield best
+            pending = [m for m in pending if m[0] >= best[1]]
+
+    def findall(self, text, overlapped=False):
+        """Return a list of (start, end, value) triples, see finditer()"""
+        return list(self.finditer(text, overlapped))
+
+    def first(self, text):
+        """Return the leftmost-longest (start, end, value) triple or None
+
+        Scanning stops as soon as the match is known
+        """
+        return next(self.finditer(text), None)
+
+    def last(self, text):
+        """Return the rightmost (start, end, value) triple or None
+
+        Mirror image of first(): the text is scanned backwards from the end
+        by a second automaton built from the reversed keywords
+        """
+        if self._reverse is None:
+            self._reverse = KeywordMatcher({k[::-1]: v for k, v in self._keywords.items()})
+        m = self._reverse.first(reversed(text))
+        if m is None:
+            return None
+        start, end, value = m
+        return len(text) - end, len(text) - start, value
+
+
+def benchmark(counts=(10, 100, 1000, 5000), words=20000, seed=0):
+    """Time findall() against a re alternation of the same random keywords"""
+    import random
+    import re
+    import string
+    from time import perf_counter
+
+    rng = random.Random(seed)
+    text = " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(words))
+    print(f"{'keywords':>8} {'automaton':>10} {'re':>10}")
+    for count in counts:
+        keywords = {"".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(count)}
+        matcher = KeywordMatcher(keywords)
+        pattern = re.compile("|".join(sorted(map(re.escape, keywords), key=len, reverse=True)))
+        start = perf_counter()
+        matcher.findall(text)
+        middle = perf_counter()
+        pattern.findall(text)
+        end = perf_counter()
+        print(f"{len(keywords):8} {middle - start:9.3f}s {end - middle:9.3f}s")
+
+
+if __name__ == "__main__":
+    from aoc import DIGITS
+
+    digits = KeywordMatcher(DIGITS)
+
+    print(digits.findall("oneight"))
+    # [(0, 3, 1)]
+    print(digits.findall("oneight", overlapped=True))
+    # [(0, 3, 1), (2, 7, 8)]
+    print(digits.findall("xtwone3four", overlapped=True))
+    # [(1, 4, 2), (3, 6, 1), (7, 11, 4)]
+
+    # first() and last() only scan as far as needed from either end
+    print(digits.first("xtwone3four"), digits.last("xtwone3four"))
+    # (1, 4, 2) (7, 11, 4)
+
+    # Leftmost-longest when keywords share a prefix
+    print(KeywordMatcher(["hand", "handy", "handful"]).findall("handy handful"))
+    # [(0, 5, 'handy'), (6, 13, 'handful')]
+
+    benchmark()
+    # keywords  automaton         re
+    #       10     0.050s     0.008s
+    #      100     0.053s     0.090s
+    #     1000     0.057s     1.487s
+    #     5000     0.108s     7.586s
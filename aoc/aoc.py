@@ -1,10 +1,7 @@
 import re
+import sys
+from contextlib import nullcontext
 
-
-with open("aoc.txt", "r") as f:
-    ex = f.read().splitlines()
-
-print(len(ex))
 DIGITS = {
     "one": 1,
     "two": 2,
@@ -17,12 +14,56 @@ DIGITS = {
     "nine": 9,
 }
 
+# Spelled out digits plus the digit characters themselves
+VALUES = {**DIGITS, **{str(v): v for v in DIGITS.values()}}
+ALTERNATION = "|".join(VALUES)
+FIRST_DIGIT = re.compile(ALTERNATION)
+# Greedy .* runs to the end of the line, then backs off until a digit
+# matches, so this finds the rightmost one even when it overlaps the
+# first, e.g. "oneight" -> eight
+LAST_DIGIT = re.compile(rf".*({ALTERNATION})")
+
+
+def calibration_value(line):
+    # Only the first and last digits matter, so scan in from both ends
+    # rather than listing every match in the line
+    first = FIRST_DIGIT.search(line)
+    if first is None:
+        return 0
+    return 10 * VALUES[first[0]] + VALUES[LAST_DIGIT.match(line)[1]]
+
+
+################
+#   Pipeline   #
+################
+"""
+read -> match -> reduce, one line at a time
+Only the current line is held in memory, so input size doesn't matter
+"""
+
+
+def read_lines(source="aoc.txt", bufsize=1 << 20):
+    """Yield lines (without line endings) from a file path, or stdin for "-"
+
+    The file is read in binary mode through a buffer of bufsize bytes
+    """
+    if source == "-":
+        cm = nullcontext(sys.stdin.buffer)
+    else:
+        cm = open(source, "rb", buffering=bufsize)
+    with cm as f:
+        for line in f:
+            yield line.rstrip(b"\r\n").decode()
+
+
+def calibration_values(lines):
+    return map(calibration_value, lines)
+
+
+def solve(source="aoc.txt"):
+    return sum(calibration_values(read_lines(source)))
 
-ex1 = ex[0]
-pat = re.compile("|".join(k for k in DIGITS.keys()))
-print(pat.search(ex1).match)
-# print(pat.sub(DIGITS[pat.search(ex1)]))
 
-replace_first = []
-# for e in ex:
-#     replace_first.append(pat.sub())
\ No newline at end of file
+if __name__ == "__main__":
+    # python aoc.py [FILE]    use - to read from stdin
+    print(solve(sys.argv[1] if len(sys.argv) > 1 else "aoc.txt"))
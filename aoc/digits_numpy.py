@@ -0,0 +1,70 @@
+import re
+import sys
+from timeit import timeit
+
+import numpy as np
+
+##########################
+#   Vectorized digits    #
+##########################
+"""
+Digit characters only (first part of the puzzle), no per line Python loop
+    file -> uint8 array -> digit mask -> digit positions
+    newline positions give the line boundaries
+First/last digit of each line = first/last digit position inside its bounds
+np.searchsorted() does this for every line at once, same result as
+np.minimum.reduceat()/np.maximum.reduceat() over a per byte position array
+but without needing an int64 per byte of input
+"""
+
+NEWLINE = ord("\n")
+ZERO, NINE = ord("0"), ord("9")
+
+
+def calibration_values(buf):
+    """Return first*10 + last digit for every line of a uint8 array
+
+    Lines without any digit get 0
+    """
+    if buf.size and buf[-1] != NEWLINE:
+        buf = np.append(buf, np.uint8(NEWLINE))
+    ends = np.flatnonzero(buf == NEWLINE)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+
+    digits = np.flatnonzero((buf >= ZERO) & (buf <= NINE))
+    if not digits.size:
+        return np.zeros(ends.size, dtype=np.int64)
+    first = np.searchsorted(digits, starts)
+    stop = np.searchsorted(digits, ends)
+    found = first < stop
+
+    # Clip so lines without digits still index safely, then zero them out
+    first = np.minimum(first, digits.size - 1)
+    last = np.maximum(stop - 1, 0)
+    values = buf[digits[first]].astype(np.int64) * 10 + buf[digits[last]] - 11 * ZERO
+    return np.where(found, values, 0)
+
+
+def solve_numpy(path):
+    return int(calibration_values(np.fromfile(path, dtype=np.uint8)).sum())
+
+
+def solve_regex(path):
+    """Per line regex version, for comparison"""
+    digit = re.compile(rb"\d")
+    total = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if m := digit.findall(line):
+                total += int(m[0]) * 10 + int(m[-1])
+    return total
+
+
+if __name__ == "__main__":
+    # python digits_numpy.py [FILE]
+    path = sys.argv[1] if len(sys.argv) > 1 else "aoc.txt"
+    print(solve_numpy(path), solve_regex(path))
+    for name in ("solve_regex", "solve_numpy"):
+        print(name, timeit(f"{name}(path)", number=10, globals=globals()))
@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from timeit import default_timer
+
+import aoc
+
+#########################
+#   Sharded execution   #
+#########################
+"""
+Lines are independent, so the input file is split into byte ranges
+Each range starts just after a newline and ends on one, no line is split
+Every worker process imports aoc once, so the DIGITS matcher is built once
+per process rather than once per shard
+"""
+
+
+def shard_offsets(path, shards):
+    """Return sorted (start, end) byte ranges of path aligned to newlines"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for k in range(1, shards):
+            f.seek(max(k * size // shards, bounds[-1]))
+            # Skip to the end of the line the rough offset landed in
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def solve_range(path, start, end):
+    """Sum of calibration values for the lines in path[start:end]"""
+    total = 0
+    with open(path, "rb", buffering=1 << 20) as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            total += aoc.calibration_value(line.rstrip(b"\r\n").decode())
+    return total
+
+
+def solve_parallel(path, workers=None, shards=None):
+    """Sum of calibration values for path, using a pool of worker processes"""
+    workers = workers or os.cpu_count()
+    # A few shards per worker evens out the load if some ranges are slower
+    ranges = shard_offsets(path, shards or 4 * workers)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(solve_range, path, a, b) for a, b in ranges]
+        return sum(fut.result() for fut in futures)
+
+
+#################
+#   Benchmark   #
+#################
+
+
+def benchmark(path, max_workers=None):
+    # More workers than cores only measures oversubscription
+    cores = os.cpu_count() or 1
+    max_workers = min(max_workers or cores, cores)
+    expected = aoc.solve(path)
+    workers = 1
+    base = None
+    while True:
+        t = default_timer()
+        assert solve_parallel(path, workers) == expected
+        t = default_timer() - t
+        base = base or t
+        print(f"{workers:>3} workers: {t:8.3f}s  speedup {base / t:5.2f}x")
+        if workers >= max_workers:
+            break
+        workers = min(2 * workers, max_workers)
+
+
+if __name__ == "__main__":
+    # python parallel.py [FILE]
+    # Without FILE, aoc.txt is repeated to build a larger input
+    if len(sys.argv) > 1:
+        benchmark(sys.argv[1])
+    else:
+        with open("aoc.txt", "rb") as f:
+            sample = f.read().rstrip(b"\n") + b"\n"
+        with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as tmp:
+            for _ in range(20000):
+                tmp.write(sample)
+        try:
+            benchmark(tmp.name)
+        finally:
+            os.remove(tmp.name)
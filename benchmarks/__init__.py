@@ -0,0 +1,2 @@
+from .cases import CASES, Case, case
+from .runner import SIZES, compare, load, regressions, report, run, save
@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+
+from .runner import SIZES, compare, load, recheck, regressions, report, run, save
+
+##################
+#   Benchmarks   #
+##################
+"""
+python -m benchmarks                      run everything, compare to baseline.json
+python -m benchmarks -k Lookarounds       only cases whose chapter/name contains this
+python -m benchmarks --save-baseline      store this run as the new baseline
+python -m benchmarks -o results.json      also write this run's results
+Exit status is 1 if any case got slower than --threshold times the baseline,
+allowing for each case's measured noise and after timing it again with
+--recheck-repeat repeats
+"""
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("-k", dest="selected", help="only cases whose chapter/name contains this")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="input sizes in characters")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--recheck-repeat", type=int, default=15, help="repeats when timing a slower case again")
+    args = parser.parse_args(argv)
+
+    results = run(sizes=args.sizes, repeat=args.repeat, selected=args.selected, log=lambda k, s: print(f"{k:70} {s * 1e6:12.2f}us"))
+    for name in results["skipped"]:
+        print(f"skipped {name}: regex module not installed")
+    if args.output:
+        save(results, args.output)
+    if args.save_baseline:
+        save(results, args.baseline)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --save-baseline first")
+        return 0
+
+    print()
+    rows = compare(results, load(args.baseline))
+    if regressions(rows, args.threshold):
+        print("timing slower cases again")
+        rows = recheck(rows, args.threshold, args.recheck_repeat, log=lambda k, s: print(f"{k:70} {s * 1e6:12.2f}us"))
+        print()
+    report(rows, args.threshold)
+    slower = regressions(rows, args.threshold)
+    print(f"{len(rows)} compared, {len(slower)} slower than {args.threshold}x baseline plus noise")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
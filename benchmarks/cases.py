@@ -0,0 +1,188 @@
+import re
+from collections import namedtuple
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+#######################
+#   Benchmark cases   #
+#######################
+"""
+Key operations from each chapter's code_snippets, with the short sample
+strings repeated to a given size
+Each case's setup(size) does all compiling and input building and returns
+the zero argument function that is timed
+"""
+
+Case = namedtuple("Case", "chapter name setup requires")
+
+CASES = []
+
+
+def case(chapter, name, requires=None):
+    def register(setup):
+        CASES.append(Case(chapter, name, setup, requires))
+        return setup
+
+    return register
+
+
+def scaled(sample, size):
+    """sample repeated to about size characters (at least once)"""
+    return sample * max(1, size // len(sample))
+
+
+SENTENCE = "This is a sample string with some words, doing is often better than thinking of doing. "
+PURCHASE = "coffee:100g tea:250g sugar:75g chocolate:50g "
+ROW = ",1,,,two,3,,,"
+WORDS = "pore42 tar3 dare7 care5 cat scatter cater scat concatenate "
+
+
+@case("re_introduction", "search last word")
+def _(size):
+    pat = re.compile(r"\bdoing\.$")
+    text = scaled(SENTENCE, size).rstrip() + " doing."
+    return lambda: pat.search(text)
+
+
+@case("re_introduction", "split")
+def _(size):
+    text = scaled("apple-85-mango-70 ", size)
+    return lambda: re.split(r"-\d+-?", text)
+
+
+@case("Anchors", "multiline line prefix")
+def _(size):
+    text = scaled("first line\nsecond line\n", size)
+    return lambda: re.sub(r"(?m)^", "> ", text)
+
+
+@case("Alternation_and_Grouping", "alternation sub")
+def _(size):
+    text = scaled("cat dog bee parrot fox ", size)
+    return lambda: re.sub(r"cat|dog|fox", "X", text)
+
+
+@case("Escaping_metacharacters", "escaped alternation")
+def _(size):
+    terms = ["c++", "a.b", "(x)", "a+b"]
+    pat = re.compile("|".join(map(re.escape, terms)))
+    text = scaled("use c++ and a.b with (x) or a+b ", size)
+    return lambda: pat.findall(text)
+
+
+@case("Dot_metacharacter_and_Quantifiers", "greedy search")
+def _(size):
+    pat = re.compile(r"(a+|\w+)*:")
+    text = scaled("aaaaaaaaaaaaaaaa:123 ", size)
+    return lambda: pat.findall(text)
+
+
+@case("Dot_metacharacter_and_Quantifiers", "possessive search")
+def _(size):
+    pat = re.compile(r"(a+|\w+)*+:")
+    text = scaled("aaaaaaaaaaaaaaaa:123 ", size)
+    return lambda: pat.findall(text)
+
+
+@case("Dot_metacharacter_and_Quantifiers", "leading zeros findall")
+def _(size):
+    pat = re.compile(r"0*\d{3,}")
+    text = scaled("42 314 001 12 00984 ", size)
+    return lambda: pat.findall(text)
+
+
+@case("Working_with_matched_portions", "sub with callable")
+def _(size):
+    pat = re.compile(r"\d+")
+    text = scaled(PURCHASE, size)
+    return lambda: pat.sub(lambda m: str(int(m[0]) ** 2), text)
+
+
+@case("Working_with_matched_portions", "finditer spans")
+def _(size):
+    pat = re.compile(r"(\w+):(\d+)")
+    text = scaled(PURCHASE, size)
+    return lambda: [m.span(2) for m in pat.finditer(text)]
+
+
+@case("Character_class", "findall words")
+def _(size):
+    text = scaled(SENTENCE, size)
+    return lambda: re.findall(r"\b[a-z]{3,}\b", text)
+
+
+@case("Groupings_and_backreferences", "duplicate words")
+def _(size):
+    pat = re.compile(r"\b(\w+)( \1)+\b")
+    text = scaled("aa a a a 42 f_1 f_1 f_13.14 ", size)
+    return lambda: pat.sub(r"\1", text)
+
+
+@case("Lookarounds", "empty fields")
+def _(size):
+    pat = re.compile(r"(?<![^,])(?![^,])")
+    text = scaled(ROW, size)
+    return lambda: pat.sub("NA", text)
+
+
+@case("Lookarounds", "lookbehind and lookahead")
+def _(size):
+    pat = re.compile(r"(?<=-)\d+(?=[:;])")
+    text = scaled("42 apple-5, fig3; x-83, y-20: f12 ", size)
+    return lambda: pat.findall(text)
+
+
+@case("Flags", "ignorecase search")
+def _(size):
+    pat = re.compile(r"THINKING OF DOING\.$", re.I)
+    text = scaled(SENTENCE, size).rstrip()
+    return lambda: pat.search(text)
+
+
+@case("Unicode", "unicode words")
+def _(size):
+    text = scaled("fox:αλεπού,eagle:αετός ", size)
+    return lambda: re.findall(r"\w+", text)
+
+
+@case("regex_module", "overlapped findall", requires="regex")
+def _(size):
+    pat = regex.compile(r"\w\w")
+    text = scaled("apple banana ", size)
+    return lambda: pat.findall(text, overlapped=True)
+
+
+@case("regex_module", "subexpression call", requires="regex")
+def _(size):
+    pat = regex.compile(r"(\d{4}-\d{2}-\d{2}).*(?1)")
+    text = scaled("today,food,nice,5632,", size) + "2008-03-24,x,2012-08-12"
+    return lambda: pat.search(text)
+
+
+@case("regex_module", "reverse search", requires="regex")
+def _(size):
+    pat = regex.compile(r"(?r)\bcat\w*")
+    text = scaled(WORDS, size)
+    return lambda: pat.search(text)
+
+
+@case("regex_module", "variable length lookbehind", requires="regex")
+def _(size):
+    pat = regex.compile(r"(?<=\b[pd][a-z]*)\d+")
+    text = scaled(WORDS, size)
+    return lambda: pat.findall(text)
+
+
+@case("regex_module", "\\K sub", requires="regex")
+def _(size):
+    pat = regex.compile(r"\b\w\K\w*\W*")
+    text = scaled("sea eat car rat eel tea ", size)
+    return lambda: pat.sub("", text)
+
+
+def available(case):
+    """False if the case needs a module that isn't installed"""
+    return case.requires != "regex" or regex is not None
@@ -0,0 +1,137 @@
+import json
+import platform
+import sys
+from time import process_time
+from timeit import Timer
+
+from .cases import CASES, available, regex
+
+#####################
+#   Run & compare   #
+#####################
+"""
+Each case is timed at each size with timeit: autorange() picks how many
+calls make up one measurement, the best of `repeat` measurements is kept
+(other processes can only make a run slower, never faster)
+CPU time of this process is measured, not wall-clock time, so time spent
+waiting while other processes run isn't counted
+How far the median measurement is above the best one is kept as the
+case's noise, a case only counts as slower when the ratio to the baseline
+is above threshold * (1 + noise of both runs), and is then timed again
+with more repeats before it's reported
+Results are keyed "chapter/name[size]" so runs with different case lists
+or sizes can still be compared where they overlap
+"""
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def key(case, size):
+    return f"{case.chapter}/{case.name}[{size}]"
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "regex": getattr(regex, "__version__", None),
+        "platform": platform.platform(),
+    }
+
+
+def run(cases=None, sizes=SIZES, repeat=5, selected=None, log=None):
+    """Time cases, return {"environment": ..., "results": {key: seconds per call}}
+
+    selected, if given, is a substring a case's "chapter/name" must contain
+    log, if given, is called with (key, seconds) after each measurement
+    """
+    results = {}
+    noise = {}
+    skipped = []
+    for case in CASES if cases is None else cases:
+        if selected and selected not in f"{case.chapter}/{case.name}":
+            continue
+        if not available(case):
+            skipped.append(f"{case.chapter}/{case.name}")
+            continue
+        for size in sizes:
+            seconds, noise[key(case, size)] = measure(case, size, repeat)
+            results[key(case, size)] = seconds
+            if log is not None:
+                log(key(case, size), seconds)
+    return {"environment": environment(), "results": results, "noise": noise, "skipped": skipped}
+
+
+def measure(case, size, repeat=5):
+    """Return (best seconds per call, noise): noise is median / best - 1"""
+    timer = Timer(case.setup(size), timer=process_time)
+    number, _ = timer.autorange()
+    times = sorted(t / number for t in timer.repeat(repeat, number))
+    best = times[0]
+    return best, (times[len(times) // 2] / best - 1 if best > 0 else 0.0)
+
+
+def compare(current, baseline):
+    """Return [(key, baseline seconds, current seconds, ratio, noise)] for shared keys
+
+    noise is the noise of both runs added up (0 for results saved without it)
+    Sorted by ratio, biggest slowdown first
+    """
+    rows = []
+    old = baseline["results"]
+    noise = current.get("noise", {})
+    old_noise = baseline.get("noise", {})
+    for k, seconds in current["results"].items():
+        if k in old and old[k] > 0:
+            rows.append((k, old[k], seconds, seconds / old[k], noise.get(k, 0.0) + old_noise.get(k, 0.0)))
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return rows
+
+
+def is_slower(row, threshold=1.25):
+    return row[3] > threshold * (1 + row[4])
+
+
+def regressions(rows, threshold=1.25):
+    return [row for row in rows if is_slower(row, threshold)]
+
+
+def recheck(rows, threshold=1.25, repeat=15, cases=None, log=None):
+    """Time the cases of slower rows again, keeping the faster of both results
+
+    One slow measurement is often another process getting in the way, a
+    real slowdown shows up again
+    Returns rows in the same form as compare()
+    """
+    by_name = {f"{case.chapter}/{case.name}": case for case in (CASES if cases is None else cases)}
+    checked = []
+    for row in rows:
+        k, old, seconds, ratio, noise = row
+        name, _, size = k.rpartition("[")
+        if is_slower(row, threshold) and name in by_name:
+            again, _ = measure(by_name[name], int(size.rstrip("]")), repeat)
+            seconds = min(seconds, again)
+            row = (k, old, seconds, seconds / old, noise)
+            if log is not None:
+                log(k, seconds)
+        checked.append(row)
+    checked.sort(key=lambda row: row[3], reverse=True)
+    return checked
+
+
+def save(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def report(rows, threshold=1.25, out=sys.stdout):
+    for row in rows:
+        k, old, new, ratio, noise = row
+        flag = "  SLOWER" if is_slower(row, threshold) else ""
+        print(f"{k:70} {old * 1e6:12.2f}us {new * 1e6:12.2f}us {ratio:6.2f}x ±{noise:5.0%}{flag}", file=out)
@@ -0,0 +1,91 @@
+import re
+from array import array
+from itertools import accumulate, chain
+
+try:
+    from re import _compiler as sre_compile
+    from re import _parser as sre_parse
+    from re._constants import SUBPATTERN
+except ImportError:
+    import sre_compile
+    import sre_parse
+    from sre_constants import SUBPATTERN
+
+###########################
+#   Batched substitution  #
+###########################
+"""
+re.sub(pattern, func, s) calls func once per match with a new Match object
+sub_batched() calls func once per batch of matches instead:
+    func(starts, ends, groups) -> list of replacement strings
+        starts, ends -> array("q") of match offsets
+        groups -> one list per group, groups[0] is the whole match,
+                  None where a group didn't take part in the match
+No Match objects are created: the pattern is wrapped in a capture group
+and split() returns the text between matches along with the groups,
+offsets come from the running total of the piece lengths
+The group is added to the parsed pattern, after all of the pattern's own
+groups, so backreferences keep their numbers and inline flags like (?i)
+stay at the start
+"""
+
+
+def _pieces(pat, string):
+    """Return (texts, columns): text between matches, then group columns"""
+    parsed = sre_parse.parse(pat.pattern, pat.flags)
+    state = parsed.state
+    whole = state.opengroup()
+    state.closegroup(whole, parsed)
+    wrapped = sre_parse.SubPattern(state, [(SUBPATTERN, (whole, 0, 0, parsed))])
+    parts = sre_compile.compile(wrapped, state.flags).split(string)
+    stride = pat.groups + 2
+    # Group columns come out as 1, 2, ..., whole match
+    return parts[::stride], [parts[stride - 1 :: stride]] + [parts[g::stride] for g in range(1, stride - 1)]
+
+
+def sub_batched(pattern, func, string, batch_size=65536, flags=0):
+    """Like re.sub() with a callable, but func gets a batch of matches at a time"""
+    pat = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+    texts, columns = _pieces(pat, string)
+    n = len(texts) - 1
+    if n == 0:
+        return string
+
+    # Offsets: text, match, text, match, ... lengths summed as we go
+    lengths = chain.from_iterable(zip(map(len, texts), map(len, columns[0])))
+    offsets = array("q", accumulate(lengths))
+    starts_all = offsets[0::2]
+    ends_all = offsets[1::2]
+
+    out = [None] * (2 * n + 1)
+    out[0::2] = texts
+    for lo in range(0, n, batch_size):
+        hi = min(lo + batch_size, n)
+        repl = func(starts_all[lo:hi], ends_all[lo:hi], [column[lo:hi] for column in columns])
+        if len(repl) != hi - lo:
+            raise ValueError(f"func returned {len(repl)} replacements for {hi - lo} matches")
+        out[2 * lo + 1 : 2 * hi : 2] = repl
+    return string[:0].join(out)
+
+
+if __name__ == "__main__":
+    import math
+
+    def num_range(starts, ends, groups):
+        return ["1" if 200 <= int(s) < 650 else "0" for s in groups[0]]
+
+    print(sub_batched(r"\d+", num_range, "45 349 651 593 4 204"))
+    # 0 1 0 1 0 1
+
+    print(sub_batched(r"(?i)ab", lambda s, e, g: [x.swapcase() for x in g[0]], "Ab aB xab"))
+    # aB Ab xAB
+
+    def log(starts, ends, groups):
+        return ["-" + str(math.log(float(s))) for s in groups[1]]
+
+    print(sub_batched(r"-(.*)", log, "next-123"))
+    # next-4.812184355372417
+
+    # Offsets are relative to the input string
+    print(sub_batched(r"(\w)\1", lambda s, e, g: [f"<{a}:{b}>" for a, b in zip(s, e)], "effort oddball", batch_size=1))
+    # e<1:3>ort o<8:10>ba<12:14>
@@ -0,0 +1,145 @@
+import mmap
+import re
+from contextlib import contextmanager
+
+from pattern_cache import compile as cached_compile
+
+############################
+#   Zero-copy byte search  #
+############################
+"""
+re works on any object that supports the buffer protocol, not just bytes
+    mmap.mmap, memoryview, bytearray, array.array
+So a large file can be searched through mmap without read()-ing it into a
+new bytes object first
+m.group() would still copy the matched portion out of the buffer, so
+results here are Hit objects that only hold offsets
+Call .view() for a zero-copy memoryview or .bytes() to get a copy
+"""
+
+
+class Hit:
+    """Offsets of one match inside buf, group 0 first"""
+
+    __slots__ = ("buf", "spans")
+
+    def __init__(self, buf, spans):
+        self.buf = buf
+        self.spans = spans
+
+    def span(self, group=0):
+        return self.spans[group]
+
+    def start(self, group=0):
+        return self.spans[group][0]
+
+    def end(self, group=0):
+        return self.spans[group][1]
+
+    def view(self, group=0):
+        """Zero-copy memoryview of the matched portion, None if group didn't match
+
+        An mmap can't be closed while views into it are alive, release()
+        them (or let them go out of scope) first
+        """
+        start, end = self.spans[group]
+        if start == -1:
+            return None
+        return memoryview(self.buf)[start:end]
+
+    def bytes(self, group=0):
+        """Copy of the matched portion, None if group didn't match"""
+        view = self.view(group)
+        return None if view is None else view.tobytes()
+
+    def __repr__(self):
+        return f"<Hit span={self.spans[0]}>"
+
+
+def as_buffer(obj):
+    """Return obj as something re can search byte by byte
+
+    Buffers with items bigger than a byte (e.g. array.array("H")) are cast
+    to a flat memoryview of bytes, so len() and offsets count bytes
+    """
+    if isinstance(obj, (bytes, bytearray, mmap.mmap)):
+        return obj
+    view = memoryview(obj)
+    if view.format == "B" and view.ndim == 1:
+        return obj
+    return view.cast("B")
+
+
+def _pattern(pattern, flags):
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    if isinstance(pattern, str):
+        pattern = pattern.encode()
+    return cached_compile(pattern, flags)
+
+
+def _hit(buf, m, groups):
+    return Hit(buf, tuple(m.span(g) for g in range(groups + 1)))
+
+
+def search(pattern, buf, pos=0, endpos=None, flags=0):
+    """First match in buf as a Hit, or None"""
+    pat = _pattern(pattern, flags)
+    buf = as_buffer(buf)
+    m = pat.search(buf, pos, len(buf) if endpos is None else endpos)
+    return None if m is None else _hit(buf, m, pat.groups)
+
+
+def finditer(pattern, buf, pos=0, endpos=None, flags=0):
+    """Yield a Hit for every non-overlapping match in buf"""
+    pat = _pattern(pattern, flags)
+    buf = as_buffer(buf)
+    groups = pat.groups
+    for m in pat.finditer(buf, pos, len(buf) if endpos is None else endpos):
+        yield _hit(buf, m, groups)
+
+
+def findall(pattern, buf, pos=0, endpos=None, flags=0):
+    """List of (start, end) offsets for every non-overlapping match in buf"""
+    pat = _pattern(pattern, flags)
+    buf = as_buffer(buf)
+    return [m.span() for m in pat.finditer(buf, pos, len(buf) if endpos is None else endpos)]
+
+
+@contextmanager
+def mapped(path):
+    """Read-only mmap of the file at path, b"" for an empty file"""
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            yield b""
+            return
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+if __name__ == "__main__":
+    ip = memoryview(b"tiger imp goat")
+    print(bool(search(rb"at", ip)))
+    # True
+    print(findall(rb"[aeiou]\w", ip))
+    # [(1, 3), (3, 5), (6, 8), (11, 13)]
+
+    hit = search(rb"(\w+) (\w+)", ip, pos=6)
+    print(hit, hit.span(2), hit.bytes(2))
+    # <Hit span=(6, 14)> (10, 14) b'goat'
+
+    import tempfile
+
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(b"42 apples and 314 mangoes\n" * 3)
+        f.flush()
+        with mapped(f.name) as buf:
+            print([h.span() for h in finditer(rb"\d+", buf, endpos=26)])
+            # [(0, 2), (14, 17)]
+            print(len(findall(rb"\d+", buf)))
+            # 6
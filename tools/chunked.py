@@ -0,0 +1,111 @@
+import re
+
+#######################
+#   Chunked scanning  #
+#######################
+"""
+Pattern.search(string, pos, endpos) restricts where a match may start/end
+but the whole string still has to be in memory
+Here the input is a stream that is read chunk_size characters at a time:
+    window = carry over + new chunk
+    matches ending before the last `overlap` characters are final
+    the rest of the window is carried over and rescanned with the next chunk
+A match that crosses a chunk boundary is therefore only reported once,
+from the window that contains all of it
+The carried over text keeps up to `overlap` characters before the resume
+point, so lookbehinds and \\b see the right context
+overlap must be at least the longest possible match plus any lookahead,
+a longer match is still found but keeps the whole window in memory
+"""
+
+
+def windows(pattern, stream, chunk_size=1 << 20, overlap=4096, flags=0):
+    """Yield (buf, base, start, matches, keep) for every window of stream
+
+    base is the stream offset of buf[0]
+    buf[start:keep] is the part of the stream this window is responsible
+    for, and matches are the final matches inside it
+    """
+    pat = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+    if chunk_size < 1 or overlap < 0:
+        raise ValueError("chunk_size must be positive and overlap non-negative")
+    buf = stream.read(chunk_size)
+    base = 0
+    pos = 0
+    last_empty = -1
+    eof = not buf
+    while True:
+        if not eof:
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buf += chunk
+        limit = len(buf) if eof else len(buf) - overlap
+        matches = []
+        keep = None
+        for m in pat.finditer(buf, pos):
+            start, end = m.span()
+            # Empty match already reported at the end of the previous window
+            if start == end == last_empty - base:
+                continue
+            # Not final yet, more input could change it
+            if end > limit or (start == end == limit and not eof):
+                keep = start
+                break
+            matches.append(m)
+            if start == end:
+                last_empty = base + start
+        if keep is None:
+            keep = max(limit, pos)
+        yield buf, base, pos, matches, keep
+        if eof:
+            return
+        new_start = max(0, keep - overlap)
+        buf = buf[new_start:]
+        base += new_start
+        pos = keep - new_start
+
+
+def finditer(pattern, stream, chunk_size=1 << 20, overlap=4096, flags=0):
+    """Yield (start, end, match) for every match in stream
+
+    start and end are offsets in the whole stream, match.span() is relative
+    to the window it was found in
+    """
+    for buf, base, start, matches, keep in windows(pattern, stream, chunk_size, overlap, flags):
+        for m in matches:
+            yield base + m.start(), base + m.end(), m
+
+
+def sub(pattern, repl, stream, out, chunk_size=1 << 20, overlap=4096, flags=0):
+    """Write stream to out with every match replaced, return the count
+
+    repl is a template string (\\1, \\g<name>) or a callable taking a Match
+    """
+    if callable(repl):
+        expand = repl
+    else:
+        expand = lambda m: m.expand(repl)
+    count = 0
+    for buf, base, done, matches, keep in windows(pattern, stream, chunk_size, overlap, flags):
+        for m in matches:
+            out.write(buf[done : m.start()])
+            out.write(expand(m))
+            done = m.end()
+        out.write(buf[done:keep])
+        count += len(matches)
+    return count
+
+
+if __name__ == "__main__":
+    import io
+
+    text = "42 apples and 314 mangoes, 5 figs\n" * 3
+    # Tiny chunks so that numbers get split across chunk boundaries
+    print([(s, e, m[0]) for s, e, m in finditer(r"\d+", io.StringIO(text), chunk_size=4, overlap=4)])
+    # [(0, 2, '42'), (14, 17, '314'), (27, 28, '5'), (34, 36, '42'), (48, 51, '314'), (61, 62, '5'), (68, 70, '42'), (82, 85, '314'), (95, 96, '5')]
+
+    out = io.StringIO()
+    print(sub(r"(\d+) (\w+)", r"\2=\1", io.StringIO(text), out, chunk_size=5, overlap=12))
+    # 9
+    print(out.getvalue() == re.sub(r"(\d+) (\w+)", r"\2=\1", text))
+    # True
@@ -0,0 +1,121 @@
+import re
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+##########################
+#   Columnar extraction  #
+##########################
+"""
+Instead of one dict per row
+    [m.groupdict() for m in re.finditer(pat, s)]
+collect each group into its own column
+    {"date": [...], "product": [...]}
+Columns are keyed by group name, or group number for unnamed groups
+Each row gives one record (first match), or one per match with
+all_matches=True, rows without a match are skipped
+Groups that didn't take part in a match are None, or "" with all_matches
+(same as re.findall())
+types maps a group to int, float or any callable converting a string
+output:
+    "list"  -> lists
+    "array" -> array("q") for int, array("d") for float, lists otherwise
+    "numpy" -> int64/float64 arrays, object arrays otherwise (needs NumPy)
+Missing values (a group that didn't match, or any "" with all_matches,
+where the two look the same) aren't converted: they are None
+in lists and object arrays, NaN in float arrays, and ValueError is raised
+for int arrays, which have no way to hold them
+"""
+
+ARRAY_CODES = {int: "q", float: "d"}
+NUMPY_DTYPES = {int: "int64", float: "float64"}
+
+
+def _converted(column, convert, all_matches, missing=None):
+    """convert applied to every value, missing where the group didn't match"""
+    if all_matches:
+        return [convert(value) if value else missing for value in column]
+    return [missing if value is None else convert(value) for value in column]
+
+
+def _flat(pat, rows, all_matches):
+    """Every group of every record in one list: g1, g2, ..., g1, g2, ..."""
+    flat = []
+    extend = flat.extend
+    if all_matches:
+        findall = pat.findall
+        if pat.groups == 1:
+            for row in rows:
+                extend(findall(row))
+        else:
+            for row in rows:
+                for groups in findall(row):
+                    extend(groups)
+    else:
+        search = pat.search
+        for row in rows:
+            if m := search(row):
+                extend(m.groups())
+    return flat
+
+
+def extract(pattern, rows, types=None, output="list", all_matches=False, flags=0):
+    """Return {group: column} for pattern applied to every row in rows"""
+    pat = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+    if not pat.groups:
+        raise ValueError("pattern needs at least one capture group")
+    if output not in ("list", "array", "numpy"):
+        raise ValueError(f"unknown output: {output!r}")
+    if output == "numpy" and np is None:
+        raise ImportError("output='numpy' requires NumPy")
+
+    names = {index: name for name, index in pat.groupindex.items()}
+    keys = [names.get(g, g) for g in range(1, pat.groups + 1)]
+    types = types or {}
+    unknown = set(types) - set(keys)
+    if unknown:
+        raise ValueError(f"types given for unknown groups: {sorted(unknown, key=str)}")
+
+    # Slicing the flat list is done in C, unlike splitting each record
+    flat = _flat(pat, rows, all_matches)
+    columns = [flat[g :: len(keys)] for g in range(len(keys))]
+    result = {}
+    for key, column in zip(keys, columns):
+        convert = types.get(key)
+        typed = output != "list" and convert in ARRAY_CODES
+        if convert is not None:
+            column = _converted(column, convert, all_matches, float("nan") if typed and convert is float else None)
+            if typed and convert is int and any(value is None for value in column):
+                raise ValueError(f"group {key!r} is missing in some records, {output} int columns can't hold that")
+        if output == "numpy":
+            result[key] = np.array(column, dtype=NUMPY_DTYPES[convert] if typed else object)
+        elif output == "array" and typed:
+            result[key] = array(ARRAY_CODES[convert], column)
+        else:
+            result[key] = column
+    return result
+
+
+if __name__ == "__main__":
+    rows = ["name:rohan,maths:75,phy:89,", "name:rose,maths:88,phy:92,"]
+    print(extract(r"name:(?P<name>\w+),maths:(?P<maths>\d+),phy:(?P<phy>\d+)", rows, types={"maths": int}))
+    # {'name': ['rohan', 'rose'], 'maths': [75, 88], 'phy': ['89', '92']}
+
+    print(extract(r"(.+?):(.+?),", rows, all_matches=True))
+    # {1: ['name', 'maths', 'phy', 'name', 'maths', 'phy'], 2: ['rohan', '75', '89', 'rose', '88', '92']}
+
+    # Optional groups stay None when converted
+    print(extract(r"(\w+)(?::(\d+))?", ["a:1", "b"], types={2: int}))
+    # {1: ['a', 'b'], 2: [1, None]}
+
+    s = ["good,bad 42,24"]
+    print(extract(r"(?P<fw>\w+),(?P<sw>\w+)", s, all_matches=True))
+    # {'fw': ['good', '42'], 'sw': ['bad', '24']}
+
+    row1 = "-2,5 4,+3 +42,-53 4356246,-357532354 "
+    cols = extract(r"(.+?),(.+?) ", [row1], types={1: int, 2: int}, output="array", all_matches=True)
+    print(cols[1], [a + b for a, b in zip(cols[1], cols[2])])
+    # array('q', [-2, 4, 42, 4356246]) [3, 7, -11, -353176108]
@@ -0,0 +1,123 @@
+import re
+
+from overlapped import starts
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+##########################
+#   First & last match   #
+##########################
+"""
+Often only the first and last matches are needed, e.g. first and last digit
+of a line, or index of the last occurrence of a word
+re.findall() builds every match in between, instead:
+    first match -> search forwards from the start
+    last match  -> look at a window at the end of the string for offsets
+                   where a match can start (see overlapped.py), doubling
+                   the window until one is found, then match() there
+Cost depends on how far the matches are from the ends, not the string length
+"last" is the match that starts rightmost, not findall()[-1]: that one
+depends on where every earlier match ended, so it can't be found without
+scanning from the start, e.g. r"\\d+" on "a123" -> "3", use r"(?<!\\d)\\d+"
+for the whole number
+"""
+
+
+def _is_regex_pattern(pattern):
+    return regex is not None and isinstance(pattern, regex.Pattern)
+
+
+def _starts(pattern, string, pos):
+    if _is_regex_pattern(pattern):
+        return (m.start() for m in pattern.finditer(string, pos, overlapped=True))
+    return starts(pattern, string, pos)
+
+
+def last_match(pattern, string, flags=0, window=256):
+    """Return the Match that starts rightmost in string, or None
+
+    The last window characters are searched for match starts first, then a
+    window twice as large before that, and so on
+    The pattern sees the whole string, so lookbehinds, \\b etc still work
+    and matches can run past the end of the window
+    regex module patterns give the same result (overlapped=True is used to
+    find the starts), which isn't always what (?r) finds: (?r)\\d+ on
+    "a123" matches "123", here it's "3"
+    """
+    if not _is_regex_pattern(pattern):
+        pattern = re.compile(pattern, flags)
+    # Starts before end are still to be looked at, an empty match can start
+    # at len(string)
+    end = len(string) + 1
+    while end > 0:
+        begin = max(0, end - window)
+        last = None
+        for pos in _starts(pattern, string, begin):
+            if pos >= end:
+                break
+            last = pos
+        if last is not None:
+            return pattern.match(string, last)
+        end = begin
+        window *= 2
+    return None
+
+
+def sub_last(pattern, repl, string, flags=0):
+    """Replace only the last match (as found by last_match()), like count=1 from the right
+
+    repl is a template string or a function, same as for re.sub()
+    """
+    m = last_match(pattern, string, flags)
+    if m is None:
+        return string
+    new = repl(m) if callable(repl) else m.expand(repl)
+    return string[: m.start()] + new + string[m.end() :]
+
+
+def first_last(pattern, string, flags=0):
+    """Return (first, last) Match objects, (None, None) if there's no match
+
+    first is the leftmost match, last is the rightmost starting match
+    Note that last can overlap first, e.g. "oneight" -> "one" and "eight"
+    """
+    if not _is_regex_pattern(pattern):
+        pattern = re.compile(pattern, flags)
+    first = pattern.search(string)
+    if first is None:
+        return None, None
+    return first, last_match(pattern, string)
+
+
+if __name__ == "__main__":
+    # Find the starting index of the last occurrence of is/the/was/to
+    for s in (
+        "match after the last newline character",
+        "and then you want to test",
+        "this is good bye then",
+        "who was there to see?",
+    ):
+        print(last_match(r"t(?:he|o)|is|was", s).start())
+    # 12
+    # 18
+    # 17
+    # 14
+
+    first, last = first_last(r"one|two|three|four|five|six|seven|eight|nine|\d", "xtwone3four")
+    print(first[0], last[0])
+    # two four
+
+    first, last = first_last(r"one|eight", "oneight")
+    print(first.span(), last.span())
+    # (0, 3) (2, 7)
+
+    # Only the part of the string near the end is looked at
+    text = "cat scatter cater " * 100000 + "scat"
+    print(last_match(r"\bs?cat\w*", text).span())
+    # (1800000, 1800004)
+
+    print(sub_last(r"(?<!\d)\d+", "[\\g<0>]", "a12 b34 c"))
+    # a12 b[34] c
@@ -0,0 +1,126 @@
+import re
+
+#########################
+#   Rewrite to fixpoint  #
+#########################
+"""
+Repeating re.subn() until nothing changes rescans the whole string on
+every pass:
+    word = "coffining"
+    while (op := re.subn(r"fin", "", word))[1]:
+        word = op[0]
+With `context`, only the text near the last edit is looked at again:
+    replace the leftmost match, resume searching `context` characters
+    before where it started, stop once there's no match left
+Nothing before that point can have changed, provided no match (including
+lookarounds) ever looks more than `context` characters away from its start
+Edits are made in a window of a few thousand characters, text left behind
+is kept in a list of pieces, so an edit costs the same however long the
+string is (only taken back if later edits walk back that far)
+Without `context` (None), whole-string subn() passes are used instead, for
+patterns like (?<![^,])([^,]++)(.*),\\1 whose reach is unbounded
+Leftmost-first rewriting gives the same fixpoint as repeated subn() passes
+unless the order of rewrites matters for the given rule
+"""
+
+
+CHUNK = 512
+
+
+class NoFixpoint(Exception):
+    """Raised when the iteration budget runs out, .partial has the result so far"""
+
+    def __init__(self, partial, count):
+        super().__init__(f"no fixpoint after {count} rewrites")
+        self.partial = partial
+        self.count = count
+
+
+def rewrite_fixpoint(pattern, repl, string, context=None, max_iterations=None, flags=0):
+    """Return (result, number of rewrites) once pattern no longer matches
+
+    max_iterations limits rewrites (or subn() passes without context)
+    """
+    pat = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+    count = 0
+    iterations = 0
+
+    if context is None:
+        while True:
+            if max_iterations is not None and iterations >= max_iterations:
+                raise NoFixpoint(string, count)
+            string, n = pat.subn(repl, string)
+            iterations += 1
+            if n == 0:
+                return string, count
+            count += n
+
+    if callable(repl):
+        expand = repl
+    elif (b"\\" if isinstance(repl, bytes) else "\\") in repl:
+        expand = lambda m: m.expand(repl)
+    else:
+        # Match.expand() parses the template again on every call
+        expand = lambda m: repl
+    chunk = max(CHUNK, 4 * context)
+    done = []  # text before the window, in pieces
+    window = string[:chunk]
+    rest = len(window)  # string[rest:] hasn't been added to the window yet
+    pos = 0
+    while True:
+        m = pat.search(window, pos)
+        # One extra character for \b and $ next to the last one looked at
+        edge = len(window) - context - 1
+        if rest < len(string) and (m is None or m.start() >= edge):
+            # Whether and how it matches depends on text past the window
+            pos = max(pos, m.start() if m and m.start() < edge else edge)
+            window += string[rest : rest + chunk]
+            rest += chunk
+        elif m is None:
+            break
+        else:
+            if max_iterations is not None and iterations >= max_iterations:
+                raise NoFixpoint(string[:0].join(done) + window + string[rest:], count)
+            iterations += 1
+            start, end = m.span()
+            new = expand(m)
+            if new == m[0]:
+                # Nothing changes, move on instead of rewriting forever
+                pos = end + (start == end)
+                if pos > len(window) and rest >= len(string):
+                    break
+                continue
+            window = window[:start] + new + window[end:]
+            count += 1
+            pos = max(0, start - context)
+
+        # Keep `context` characters before pos (and one for \b, ^) in the window
+        while done and pos <= context:
+            piece = done.pop()
+            window = piece + window
+            pos += len(piece)
+        if pos > chunk + context:
+            cut = pos - context - 1
+            done.append(window[:cut])
+            window = window[cut:]
+            pos -= cut
+    return string[:0].join(done) + window, count
+
+
+if __name__ == "__main__":
+    print(rewrite_fixpoint(r"fin", "", "coffining", context=3))
+    # ('cog', 2)
+
+    # Reduce nested brackets one level at a time
+    print(rewrite_fixpoint(r"\(\)", "", "(()(()))x()", context=2))
+    # ('x', 5)
+
+    row = "421,cat,2425,42,5,cat,6,6,42,61,6,6,6,6,4"
+    print(rewrite_fixpoint(r"(?<![^,])([^,]++)(.*),\1(?![^,])", r"\1\2", row)[0])
+    # 421,cat,2425,42,5,6,61,4
+
+    try:
+        rewrite_fixpoint(r"a", "aa", "a", context=1, max_iterations=100)
+    except NoFixpoint as e:
+        print(e, len(e.partial))
+    # no fixpoint after 100 rewrites 101
@@ -0,0 +1,195 @@
+import random
+import re
+from collections import namedtuple
+from time import perf_counter
+
+from redos import FAIL_CHARS, UNIVERSE, analyze, first, parse, pump, repeats_preorder, sample
+
+#############################
+#   Worst case input fuzzer #
+#############################
+"""
+Instead of hand making a string like 'aaaaaaaaaaaaaaaa-123' to show that
+(a+|\\w+)*: backtracks badly, search for slow inputs automatically
+Slow inputs almost always look like
+    prefix + pump * k + suffix
+a prefix that reaches a repeat, a part the repeat can match in many ways,
+and a suffix that makes the rest of the pattern fail
+Candidates are seeded from the pattern's structure (redos.py witnesses,
+samples and characters of each repeated part), then mutated, and the
+slowest ones are kept for the next round
+A candidate is scored by growing k until one call takes `probe` seconds or
+the input reaches max_length: hitting the time limit with a shorter input
+ranks higher, otherwise the slowest input of max_length wins
+re doesn't report step counts, so wall-clock time is what's measured
+"""
+
+SlowInput = namedtuple("SlowInput", "text prefix pump suffix length seconds")
+
+
+def _measure(call, text, target=1e-3):
+    """Seconds for one call(text), repeated when it's too quick to time"""
+    start = perf_counter()
+    call(text)
+    elapsed = perf_counter() - start
+    if elapsed >= target:
+        if elapsed < 50 * target:
+            # One more try, a single slow call could just be noise
+            start = perf_counter()
+            call(text)
+            elapsed = min(elapsed, perf_counter() - start)
+        return elapsed
+    number = min(1000, int(target / max(elapsed, 1e-7)))
+    start = perf_counter()
+    for _ in range(number):
+        call(text)
+    return min(elapsed, (perf_counter() - start) / number)
+
+
+def _lengths(prefix, pump, suffix, max_length):
+    """Repeat counts to try, growing by about 25% each time"""
+    k = 1
+    while True:
+        length = len(prefix) + len(pump) * k + len(suffix)
+        if length > max_length:
+            return
+        yield k
+        k = max(k + 1, k * 5 // 4)
+
+
+def growth_curve(pattern, prefix, pump, suffix, flags=0, op="search", max_length=10000, budget=0.5):
+    """[(length, seconds), ...] for prefix + pump * k + suffix with growing k
+
+    Stops once a call takes longer than budget seconds or max_length is reached
+    """
+    call = getattr(re.compile(pattern, flags), op)
+    curve = []
+    for k in _lengths(prefix, pump, suffix, max_length):
+        text = prefix + pump * k + suffix
+        seconds = _measure(call, text)
+        curve.append((len(text), seconds))
+        if seconds > budget:
+            break
+    return curve
+
+
+def _score(curve, probe):
+    length, seconds = curve[-1]
+    if seconds > probe:
+        return (1, -length, seconds)
+    return (0, 0, seconds)
+
+
+def _seeds(pattern, flags):
+    seq, flags = parse(pattern, flags)
+    count = 16
+    for finding in analyze(pattern, flags, pump_length=count):
+        witness = finding.witness
+        yield witness[: -count - 1], witness[-count - 1], witness[-1]
+
+    lead = sample(seq, flags)
+    suffixes = [c for c in FAIL_CHARS if c not in first(seq, flags)][:2] + [""]
+    for item in repeats_preorder(seq):
+        body = item[1][2]
+        pumps = [sample(body, flags)] + sorted(pump(body, flags), key=UNIVERSE.index)[:3]
+        for part in pumps:
+            if not part:
+                continue
+            for suffix in suffixes:
+                yield "", part, suffix
+                if lead and lead != part:
+                    yield lead, part, suffix
+
+
+def _alphabet(pattern, flags):
+    seq, flags = parse(pattern, flags)
+    chars = set(FAIL_CHARS) | first(seq, flags)
+    for item in repeats_preorder(seq):
+        chars |= pump(item[1][2], flags) | first(item[1][2], flags)
+    literal = pattern.pattern if isinstance(pattern, re.Pattern) else pattern
+    chars |= {c for c in literal if c.isprintable() and c not in "\\()[]{}*+?|^$."}
+    return sorted(chars, key=lambda c: (c not in UNIVERSE, UNIVERSE.find(c), c))
+
+
+def _mutate(rng, candidate, alphabet):
+    parts = list(candidate)
+    index = rng.randrange(3)
+    part = parts[index]
+    action = rng.randrange(5)
+    if action == 0 or not part:
+        pos = rng.randint(0, len(part))
+        part = part[:pos] + rng.choice(alphabet) + part[pos:]
+    elif action == 1:
+        pos = rng.randrange(len(part))
+        part = part[:pos] + part[pos + 1 :]
+    elif action == 2:
+        pos = rng.randrange(len(part))
+        part = part[:pos] + rng.choice(alphabet) + part[pos + 1 :]
+    elif action == 3:
+        part = part * 2
+    else:
+        # Move characters between neighbouring parts
+        other = (index + rng.choice((-1, 1))) % 3
+        parts[other] = parts[other] + part[-1:]
+        part = part[:-1]
+    parts[index] = part[:16]
+    if not parts[1]:
+        parts[1] = rng.choice(alphabet)
+    return tuple(parts)
+
+
+def fuzz(pattern, flags=0, op="search", max_length=2000, rounds=8, population=12, probe=2e-3, seed=0, top=5):
+    """Return the slowest inputs found for pattern, slowest first
+
+    op is the Pattern method to time: "search", "match" or "fullmatch"
+    Each SlowInput has the input text, its prefix/pump/suffix parts and
+    the length and seconds of the slowest call seen while scoring it
+    """
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags
+    call = getattr(re.compile(pattern, flags), op)
+    rng = random.Random(seed)
+    alphabet = _alphabet(pattern, flags)
+
+    scored = {}
+
+    def evaluate(candidate):
+        if candidate in scored:
+            return
+        prefix, part, suffix = candidate
+        curve = []
+        for k in _lengths(prefix, part, suffix, max_length):
+            text = prefix + part * k + suffix
+            seconds = _measure(call, text)
+            curve.append((len(text), seconds))
+            if seconds > probe:
+                break
+        if curve:
+            scored[candidate] = (_score(curve, probe), curve[-1])
+
+    for candidate in dict.fromkeys(_seeds(pattern, flags)):
+        evaluate(candidate)
+    for _ in range(rounds):
+        best = sorted(scored, key=lambda c: scored[c][0], reverse=True)[:population]
+        for candidate in best:
+            for _ in range(3):
+                evaluate(_mutate(rng, candidate, alphabet))
+
+    ranked = sorted(scored, key=lambda c: scored[c][0], reverse=True)[:top]
+    result = []
+    for prefix, part, suffix in ranked:
+        length, seconds = scored[(prefix, part, suffix)][1]
+        k = (length - len(prefix) - len(suffix)) // len(part)
+        result.append(SlowInput(prefix + part * k + suffix, prefix, part, suffix, length, seconds))
+    return result
+
+
+if __name__ == "__main__":
+    # Timings vary from run to run, so does the exact input found
+    for pattern in (r"(a+|\w+)*:", r"\d+\d+x", r"[a-z]+\d+"):
+        best = fuzz(pattern, max_length=500)[0]
+        curve = growth_curve(pattern, best.prefix, best.pump, best.suffix, max_length=500, budget=0.1)
+        print(f"{pattern:12} {best.text[:24]!r:28}", " ".join(f"{n}:{t:.0e}" for n, t in curve[::4]))
+    # (a+|\w+)*:   'aaaaaaaaa'                  2:2e-06 6:1e-04 11:6e-02
+    # \d+\d+x      '000000000000000000000000'   2:1e-07 6:1e-06 11:4e-06 23:2e-05 52:2e-04 122:3e-03 294:8e-02
+    # [a-z]+\d+    '\x00vvvvvvvvvvvvvvvvvvvvvvv' 2:4e-07 6:9e-07 11:2e-06 23:9e-06 52:5e-05 122:2e-04 294:1e-03
@@ -0,0 +1,172 @@
+import mmap
+import re
+
+from redos import children, op_name, parse
+
+#######################
+#   Whole buffer grep  #
+#######################
+"""
+Instead of
+    for line in para.split("\n"):
+        if pat.search(line): ...
+search the whole buffer once in MULTILINE mode and map each match back to
+the line it's on with str.rfind()/str.find()
+After a match, the search resumes at the next line, so lines with many
+matches cost no more than lines with one
+Lines without a match are never looked at unless invert=True asks for them
+
+Use ^ and $ to anchor to line boundaries, \\A and \\Z refer to the buffer
+Lookarounds would see the newline and the lines around it, which
+a line on its own doesn't have, and possessive quantifiers and atomic
+groups can run into the newline and then not give it back, failing where
+the line on its own matches (\\s++$ on " \\n\\n"), so patterns with any
+of these are searched line by line instead
+"""
+
+
+def _compile(pattern, flags):
+    if isinstance(pattern, re.Pattern):
+        if pattern.flags & re.M:
+            return pattern
+        return re.compile(pattern.pattern, pattern.flags | re.M)
+    return re.compile(pattern, flags | re.M)
+
+
+def _count_newlines(buf, nl, start, end):
+    # mmap has no count() method, slicing it returns bytes
+    if isinstance(buf, mmap.mmap):
+        return buf[start:end].count(nl)
+    return buf.count(nl, start, end)
+
+
+def _needs_each_line(seq):
+    """True if seq has lookarounds, possessive quantifiers or atomic groups"""
+    for item in seq:
+        if op_name(item[0]) in ("ASSERT", "ASSERT_NOT", "POSSESSIVE_REPEAT", "ATOMIC_GROUP"):
+            return True
+        if any(_needs_each_line(sub) for sub, _, _ in children(item)):
+            return True
+    return False
+
+
+def _each_line_spans(pat, buf, nl):
+    size = len(buf)
+    start = 0
+    while start < size:
+        end = buf.find(nl, start)
+        if end == -1:
+            end = size
+        if pat.search(buf[start:end]):
+            yield start, end
+        start = end + 1
+
+
+def line_spans(pattern, buf, flags=0):
+    """Yield (start, end) of every line in buf that contains a match
+
+    end excludes the newline character
+    """
+    pat = _compile(pattern, flags)
+    nl = b"\n" if isinstance(pattern, bytes) or isinstance(pat.pattern, bytes) else "\n"
+    if _needs_each_line(parse(pat)[0]):
+        yield from _each_line_spans(pat, buf, nl)
+        return
+    size = len(buf)
+    pos = 0
+    while pos <= size:
+        m = pat.search(buf, pos)
+        if m is None:
+            return
+        start = m.start()
+        # Empty match after the final newline isn't on a line
+        if start == size and (size == 0 or buf[size - 1 : size] == nl):
+            return
+        line_start = buf.rfind(nl, 0, start) + 1
+        line_end = buf.find(nl, start)
+        if line_end == -1:
+            line_end = size
+        # Match ran into later lines, so check the line on its own
+        if m.end() > line_end and pat.search(buf, line_start, line_end) is None:
+            pos = line_end + 1
+            continue
+        yield line_start, line_end
+        pos = line_end + 1
+
+
+def grep(pattern, buf, flags=0, invert=False, line_numbers=False):
+    """Yield lines of buf that match pattern (or don't, with invert=True)
+
+    With line_numbers=True, (lineno, line) tuples are yielded, starting at 1
+    """
+    nl = b"\n" if isinstance(buf, (bytes, bytearray, mmap.mmap)) else "\n"
+    lineno = 1
+    prev = 0
+    for start, end in line_spans(pattern, buf, flags):
+        if invert:
+            if start > prev:
+                for line in buf[prev : start - 1].split(nl):
+                    yield (lineno, line) if line_numbers else line
+                    lineno += 1
+        elif line_numbers:
+            lineno += _count_newlines(buf, nl, prev, start)
+            yield lineno, buf[start:end]
+        else:
+            yield buf[start:end]
+        lineno += 1
+        prev = end + 1
+
+    if invert and prev < len(buf):
+        tail = buf[prev:]
+        if tail.endswith(nl):
+            tail = tail[:-1]
+        for line in tail.split(nl):
+            yield (lineno, line) if line_numbers else line
+            lineno += 1
+
+
+def grep_count(pattern, buf, flags=0, invert=False):
+    """Number of lines that match pattern (or don't, with invert=True)"""
+    matched = sum(1 for _ in line_spans(pattern, buf, flags))
+    if not invert:
+        return matched
+    nl = b"\n" if isinstance(buf, (bytes, bytearray, mmap.mmap)) else "\n"
+    size = len(buf)
+    total = _count_newlines(buf, nl, 0, size)
+    if size and buf[size - 1 : size] != nl:
+        total += 1
+    return total - matched
+
+
+def grep_file(pattern, path, flags=0, invert=False, line_numbers=False):
+    """grep() over a memory-mapped file, lines are yielded as bytes"""
+    if isinstance(pattern, str):
+        pattern = pattern.encode()
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return
+        with buf:
+            yield from grep(pattern, buf, flags, invert, line_numbers)
+
+
+if __name__ == "__main__":
+    para = """good start
+Start working on that
+project you always wanted
+stars are shining brightly
+hi there
+start and try to
+finish the book
+bye"""
+
+    print(list(grep(r"start", para, flags=re.I, invert=True)))
+    # ['project you always wanted', 'stars are shining brightly', 'hi there', 'finish the book', 'bye']
+    print(list(grep(r"start", para, flags=re.I, line_numbers=True)))
+    # [(1, 'good start'), (2, 'Start working on that'), (6, 'start and try to')]
+    print(grep_count(r"start", para, flags=re.I), grep_count(r"start", para, flags=re.I, invert=True))
+    # 3 5
+    print(list(grep(r"^s", para, line_numbers=True)))
+    # [(4, 'stars are shining brightly'), (6, 'start and try to')]
@@ -0,0 +1,337 @@
+import atexit
+import multiprocessing
+import re
+import threading
+
+from pattern_cache import compile as cached_compile
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+########################
+#   Guarded matching   #
+########################
+"""
+A pattern like (a+|\\w+)*: on 'aaaaaaaaaaaaaaaa-123' keeps search() busy for
+seconds, and re has no way to interrupt a running match: the call holds
+the GIL until it is done, so a thread can't stop it either
+GuardedPool runs the match in a worker process instead:
+    the parent waits at most `timeout` seconds for the answer
+    if it's late, the worker is killed and replaced by a fresh one
+      and MatchTimeout is raised
+    if the worker dies instead, it's replaced too and WorkerDied is raised
+Each call pays for sending the string to the worker and the result back,
+so this is meant for untrusted patterns/input, not hot loops
+Matches come back as GuardedMatch objects (spans and groups only),
+callable repl for sub() has to be picklable, i.e. a module level function
+With backend="regex" the regex module's own timeout argument is used and
+no worker is needed
+"""
+
+
+class MatchTimeout(Exception):
+    """Raised when a guarded call doesn't finish within its time budget"""
+
+    def __init__(self, pattern, timeout):
+        super().__init__(f"no result within {timeout}s for pattern {pattern!r}")
+        self.pattern = pattern
+        self.timeout = timeout
+
+
+class WorkerDied(Exception):
+    """Raised when the worker process exits (crash, out of memory, killed) mid-call"""
+
+    def __init__(self, pattern, exitcode):
+        super().__init__(f"worker process exited with code {exitcode} while matching pattern {pattern!r}")
+        self.pattern = pattern
+        self.exitcode = exitcode
+
+
+class GuardedMatch:
+    """Stand-in for a Match object returned by a worker process"""
+
+    __slots__ = ("string", "spans", "groupindex")
+
+    def __init__(self, string, spans, groupindex):
+        self.string = string
+        self.spans = spans
+        self.groupindex = groupindex
+
+    def _index(self, group):
+        return self.groupindex[group] if isinstance(group, str) else group
+
+    def span(self, group=0):
+        return self.spans[self._index(group)]
+
+    def start(self, group=0):
+        return self.span(group)[0]
+
+    def end(self, group=0):
+        return self.span(group)[1]
+
+    def group(self, *groups):
+        if len(groups) > 1:
+            return tuple(map(self.group, groups))
+        start, end = self.span(groups[0] if groups else 0)
+        return None if start == -1 else self.string[start:end]
+
+    __getitem__ = group
+
+    def groups(self, default=None):
+        return tuple(default if g is None else g for g in map(self.group, range(1, len(self.spans))))
+
+    def groupdict(self, default=None):
+        return {name: default if self.span(name)[0] == -1 else self.group(name) for name in self.groupindex}
+
+    def __repr__(self):
+        return f"<GuardedMatch span={self.spans[0]} match={self.group()!r}>"
+
+
+def _run(op, pattern, flags, string, args):
+    pat = cached_compile(pattern, flags)
+    if op in ("search", "match", "fullmatch"):
+        m = getattr(pat, op)(string, *args)
+        return None if m is None else tuple(m.span(g) for g in range(pat.groups + 1))
+    return getattr(pat, op)(*args[:1], string, *args[1:])
+
+
+def _worker(conn):
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        try:
+            conn.send((True, _run(*job)))
+        except Exception as e:
+            conn.send((False, e))
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class GuardedPool:
+    """Pool of worker processes that run matches under a time budget
+
+    processes is the number of calls that can run at the same time
+    (from different threads), workers are started on first use
+    """
+
+    def __init__(self, processes=1, timeout=1.0):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self.processes = processes
+        self.timeout = timeout
+        self.kills = 0
+        self._context = multiprocessing.get_context()
+        self._idle = []
+        self._started = 0
+        # Notified whenever a worker is put back or discarded
+        self._changed = threading.Condition()
+
+    def _acquire(self):
+        with self._changed:
+            while not self._idle and self._started >= self.processes:
+                self._changed.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+        try:
+            return _Worker(self._context)
+        except BaseException:
+            with self._changed:
+                self._started -= 1
+                self._changed.notify()
+            raise
+
+    def _release(self, worker):
+        with self._changed:
+            self._idle.append(worker)
+            self._changed.notify()
+
+    def _call(self, op, pattern, string, args=(), flags=0, timeout=None, backend="re"):
+        timeout = self.timeout if timeout is None else timeout
+        if isinstance(pattern, re.Pattern):
+            pattern, flags = pattern.pattern, pattern.flags
+        if backend == "regex":
+            return _call_regex(op, pattern, flags, string, args, timeout)
+        if backend != "re":
+            raise ValueError(f"unknown or unavailable backend: {backend!r}")
+
+        worker = self._acquire()
+        try:
+            worker.conn.send((op, pattern, flags, string, args))
+            ready = worker.conn.poll(timeout)
+        except BaseException:
+            # State of the pipe is unknown, don't hand this worker out again
+            self._discard(worker)
+            raise
+        if not ready:
+            self._discard(worker)
+            with self._changed:
+                self.kills += 1
+            raise MatchTimeout(pattern, timeout)
+        try:
+            ok, result = worker.conn.recv()
+        except (EOFError, OSError):
+            # poll() also returns True once the other end is gone
+            self._discard(worker)
+            raise WorkerDied(pattern, worker.process.exitcode) from None
+        except BaseException:
+            self._discard(worker)
+            raise
+        self._release(worker)
+        if not ok:
+            raise result
+        if op in ("search", "match", "fullmatch") and result is not None:
+            groupindex = cached_compile(pattern, flags).groupindex
+            return GuardedMatch(string, result, dict(groupindex))
+        return result
+
+    def _discard(self, worker):
+        worker.kill()
+        # A thread waiting in _acquire() can start a replacement now
+        with self._changed:
+            self._started -= 1
+            self._changed.notify()
+
+    def search(self, pattern, string, flags=0, timeout=None, backend="re"):
+        return self._call("search", pattern, string, (), flags, timeout, backend)
+
+    def match(self, pattern, string, flags=0, timeout=None, backend="re"):
+        return self._call("match", pattern, string, (), flags, timeout, backend)
+
+    def fullmatch(self, pattern, string, flags=0, timeout=None, backend="re"):
+        return self._call("fullmatch", pattern, string, (), flags, timeout, backend)
+
+    def findall(self, pattern, string, flags=0, timeout=None, backend="re"):
+        return self._call("findall", pattern, string, (), flags, timeout, backend)
+
+    def sub(self, pattern, repl, string, count=0, flags=0, timeout=None, backend="re"):
+        return self._call("sub", pattern, string, (repl, count), flags, timeout, backend)
+
+    def subn(self, pattern, repl, string, count=0, flags=0, timeout=None, backend="re"):
+        return self._call("subn", pattern, string, (repl, count), flags, timeout, backend)
+
+    def close(self):
+        """Stop the idle workers, the pool can still be used afterwards"""
+        with self._changed:
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+            self._changed.notify(len(idle))
+        for worker in idle:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _call_regex(op, pattern, flags, string, args, timeout):
+    if regex is None:
+        raise ValueError("unknown or unavailable backend: 'regex'")
+    pat = cached_compile(pattern, flags, "regex")
+    try:
+        if op in ("search", "match", "fullmatch", "findall"):
+            return getattr(pat, op)(string, timeout=timeout)
+        return getattr(pat, op)(args[0], string, args[1], timeout=timeout)
+    except TimeoutError:
+        raise MatchTimeout(pattern, timeout) from None
+
+
+###########################
+#   Module level helpers  #
+###########################
+"""
+Same calls through a shared single worker pool, started on first use
+"""
+
+default_pool = GuardedPool()
+atexit.register(default_pool.close)
+
+
+def search(pattern, string, flags=0, timeout=1.0, backend="re"):
+    return default_pool.search(pattern, string, flags, timeout, backend)
+
+
+def match(pattern, string, flags=0, timeout=1.0, backend="re"):
+    return default_pool.match(pattern, string, flags, timeout, backend)
+
+
+def fullmatch(pattern, string, flags=0, timeout=1.0, backend="re"):
+    return default_pool.fullmatch(pattern, string, flags, timeout, backend)
+
+
+def findall(pattern, string, flags=0, timeout=1.0, backend="re"):
+    return default_pool.findall(pattern, string, flags, timeout, backend)
+
+
+def sub(pattern, repl, string, count=0, flags=0, timeout=1.0, backend="re"):
+    return default_pool.sub(pattern, repl, string, count, flags, timeout, backend)
+
+
+def subn(pattern, repl, string, count=0, flags=0, timeout=1.0, backend="re"):
+    return default_pool.subn(pattern, repl, string, count, flags, timeout, backend)
+
+
+if __name__ == "__main__":
+    s2 = "aaaaaaaaaaaaaaaa-123" * 2
+
+    m = search(r"(?P<word>\w+):(\d+)", "coffee:100g tea:250g")
+    print(m, m["word"], m.groups())
+    # <GuardedMatch span=(0, 10) match='coffee:100'> coffee ('coffee', '100')
+
+    print(sub(r"\d+", "N", "coffee:100g tea:250g"))
+    # coffee:Ng tea:Ng
+
+    try:
+        search(r"(a+|\w+)*:", s2, timeout=0.5)
+    except MatchTimeout as e:
+        print(e)
+    # no result within 0.5s for pattern '(a+|\\w+)*:'
+
+    # The killed worker was replaced, the pool keeps working
+    print(search(r"(a+|\w+)*+:", s2), default_pool.kills)
+    # None 1
+
+    # Two threads, one worker: the second one waits, then gets a fresh worker
+    def slow_search(results):
+        try:
+            search(r"(a+|\w+)*:", s2, timeout=0.3)
+        except MatchTimeout:
+            results.append("timeout")
+
+    results = []
+    threads = [threading.Thread(target=slow_search, args=(results,)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(results, default_pool.kills)
+    # ['timeout', 'timeout'] 3
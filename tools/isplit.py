@@ -0,0 +1,72 @@
+import re
+
+from chunked import windows
+
+##############
+#   isplit   #
+##############
+"""
+Lazy version of re.split(), pieces are yielded one at a time
+Same output as re.split():
+    text between separators, in order
+    captured groups of each separator right after the text before it,
+    None for groups that didn't take part in the match
+    at most maxsplit splits if maxsplit is non-zero, the rest is the last piece
+Input can be a str/bytes or a stream (anything with a read() method), which
+is scanned in windows, see chunked.py for chunk_size and overlap
+"""
+
+
+def _isplit_string(pat, string, maxsplit):
+    done = 0
+    for n, m in enumerate(pat.finditer(string), 1):
+        yield string[done : m.start()]
+        yield from m.groups()
+        done = m.end()
+        if n == maxsplit:
+            break
+    yield string[done:]
+
+
+def _isplit_stream(pat, stream, maxsplit, chunk_size, overlap):
+    pending = []
+    n = 0
+    for buf, base, done, matches, keep in windows(pat, stream, chunk_size, overlap):
+        for m in matches:
+            if maxsplit and n == maxsplit:
+                break
+            pending.append(buf[done : m.start()])
+            yield buf[:0].join(pending)
+            yield from m.groups()
+            pending = []
+            done = m.end()
+            n += 1
+        pending.append(buf[done:keep])
+    # Every window adds to pending, so it's never empty here
+    yield pending[0][:0].join(pending)
+
+
+def isplit(pattern, string, maxsplit=0, flags=0, chunk_size=1 << 20, overlap=4096):
+    """Yield the pieces re.split(pattern, string, maxsplit, flags) would return"""
+    pat = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+    if hasattr(string, "read"):
+        return _isplit_stream(pat, string, maxsplit, chunk_size, overlap)
+    return _isplit_string(pat, string, maxsplit)
+
+
+if __name__ == "__main__":
+    import io
+
+    print(list(isplit(r"-", "apple-85-mango-70", maxsplit=2)))
+    # ['apple', '85', 'mango-70']
+    print(list(isplit(r"(\W+)", "first,second-third")))
+    # ['first', ',', 'second', '-', 'third']
+    print(list(isplit(r"hand(y)?", "123hand42handy777")))
+    # ['123', None, '42', 'y', '777']
+
+    records = io.StringIO("id:1;name:cat;;id:2;name:dog;;id:3")
+    for record in isplit(r";;", records, chunk_size=4, overlap=2):
+        print(record)
+    # id:1;name:cat
+    # id:2;name:dog
+    # id:3
@@ -0,0 +1,177 @@
+import re
+
+try:
+    from re import _parser as sre_parse
+    from re._constants import LITERAL
+except ImportError:
+    import sre_parse
+    from sre_constants import LITERAL
+
+#########################
+#   Literal fast path   #
+#########################
+"""
+Patterns like r"0xB0", r"5" or r"note" have no metacharacters
+Searching for them is the same as str.find(), substituting is str.replace()
+and those are faster than going through the regex engine
+LiteralPattern has the same methods as re.Pattern and uses str/bytes
+methods where it can, anything else goes to the compiled regex
+Case-insensitive literals are handled when both literal and input are ASCII
+Match objects are real re.Match objects: once str.find() has located a
+match, the compiled regex is anchored at that position to produce it
+"""
+
+
+def literal_text(pattern, flags=0):
+    """Return the literal str/bytes that pattern matches, or None
+
+    None if pattern has any metacharacter, or is empty, or is
+    case-insensitive with non-ASCII characters
+    """
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+    if not len(parsed) or any(op is not LITERAL for op, _ in parsed):
+        return None
+    codes = [av for _, av in parsed]
+    text = bytes(codes) if isinstance(pattern, bytes) else "".join(map(chr, codes))
+    if parsed.state.flags & re.I and (parsed.state.flags & re.L or not text.isascii()):
+        return None
+    return text
+
+
+class LiteralPattern:
+    def __init__(self, pattern, flags=0):
+        self._regex = re.compile(pattern, flags)
+        literal = literal_text(self._regex)
+        if literal is None:
+            raise ValueError(f"not a literal pattern: {pattern!r}")
+        self.pattern = self._regex.pattern
+        self.flags = self._regex.flags
+        self.groups = 0
+        self.groupindex = self._regex.groupindex
+        self.ignorecase = bool(self.flags & re.I)
+        self.literal = literal.lower() if self.ignorecase else literal
+        self._type = type(literal)
+
+    def __repr__(self):
+        return f"LiteralPattern({self.pattern!r})"
+
+    def _haystack(self, string):
+        """string to run .find() on, or None if the regex has to be used"""
+        if type(string) is not self._type:
+            return None
+        if self.ignorecase:
+            return string.lower() if string.isascii() else None
+        return string
+
+    @staticmethod
+    def _bounds(string, pos, endpos):
+        # re clamps pos/endpos to the string, str.find() would count
+        # negative values from the end instead
+        size = len(string)
+        pos = min(max(pos, 0), size)
+        endpos = size if endpos is None else min(max(endpos, 0), size)
+        return pos, endpos
+
+    def _positions(self, hay, pos, endpos):
+        # Non-overlapping occurrences, same as re.finditer() for a literal
+        literal = self.literal
+        n = len(literal)
+        i = hay.find(literal, pos, endpos)
+        while i != -1:
+            yield i
+            i = hay.find(literal, i + n, endpos)
+
+    def search(self, string, pos=0, endpos=None):
+        hay = self._haystack(string)
+        pos, endpos = self._bounds(string, pos, endpos)
+        if hay is None:
+            return self._regex.search(string, pos, endpos)
+        i = hay.find(self.literal, pos, endpos)
+        return None if i == -1 else self._regex.match(string, i, endpos)
+
+    def match(self, string, pos=0, endpos=None):
+        endpos = len(string) if endpos is None else endpos
+        return self._regex.match(string, pos, endpos)
+
+    def fullmatch(self, string, pos=0, endpos=None):
+        endpos = len(string) if endpos is None else endpos
+        return self._regex.fullmatch(string, pos, endpos)
+
+    def finditer(self, string, pos=0, endpos=None):
+        hay = self._haystack(string)
+        pos, endpos = self._bounds(string, pos, endpos)
+        if hay is None:
+            return self._regex.finditer(string, pos, endpos)
+        match = self._regex.match
+        return (match(string, i, endpos) for i in self._positions(hay, pos, endpos))
+
+    def findall(self, string, pos=0, endpos=None):
+        hay = self._haystack(string)
+        pos, endpos = self._bounds(string, pos, endpos)
+        if hay is None:
+            return self._regex.findall(string, pos, endpos)
+        if not self.ignorecase:
+            return [self.literal] * hay.count(self.literal, pos, endpos)
+        n = len(self.literal)
+        return [string[i : i + n] for i in self._positions(hay, pos, endpos)]
+
+    def _plain(self, string, repl):
+        # str.replace()/str.split() only give the same result as the regex
+        # for case-sensitive matching and a replacement without escapes
+        if self.ignorecase or type(string) is not self._type:
+            return False
+        backslash = b"\\" if self._type is bytes else "\\"
+        return repl is None or (type(repl) is self._type and backslash not in repl)
+
+    def sub(self, repl, string, count=0):
+        # count < 0 means no replacements for re, but all of them for str.replace()
+        if count < 0 or not self._plain(string, repl):
+            return self._regex.sub(repl, string, count)
+        return string.replace(self.literal, repl, count or -1)
+
+    def subn(self, repl, string, count=0):
+        if count < 0 or not self._plain(string, repl):
+            return self._regex.subn(repl, string, count)
+        n = string.count(self.literal)
+        if count:
+            n = min(n, count)
+        return string.replace(self.literal, repl, n), n
+
+    def split(self, string, maxsplit=0):
+        if maxsplit < 0 or not self._plain(string, None):
+            return self._regex.split(string, maxsplit)
+        return string.split(self.literal, maxsplit or -1)
+
+
+def compile(pattern, flags=0):
+    """LiteralPattern if pattern is a plain literal, re.Pattern otherwise"""
+    if literal_text(pattern, flags) is not None:
+        return LiteralPattern(pattern, flags)
+    return re.compile(pattern, flags)
+
+
+if __name__ == "__main__":
+    print(literal_text(r"0xB0"), literal_text(r"5"), literal_text(r"\."), literal_text(r"a.b"))
+    # 0xB0 5 . None
+
+    line1 = "start address: 0xA0, func1 address: 0xC0"
+    line2 = "end address: 0xFF, func2 address: 0xB0"
+    pat = compile(r"0xB0")
+    print(pat, bool(pat.search(line1)), pat.search(line2))
+    # LiteralPattern('0xB0') False <re.Match object; span=(34, 38), match='0xB0'>
+
+    five = compile(r"5")
+    print(five.sub(r"five", "They ate 5 apples and 5 oranges", 1))
+    # They ate five apples and 5 oranges
+
+    note = compile(r"note", flags=re.I)
+    print(note.sub("X", "This note should not be NoTeD"), note.findall("This note should not be NoTeD"))
+    # This X should not be XD ['note', 'NoTe']
+
+    print(compile(rb"at").findall(b"tiger imp goat"))
+    # [b'at']
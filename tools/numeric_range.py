@@ -0,0 +1,101 @@
+import re
+
+###############################
+#   Numeric range to regex    #
+###############################
+"""
+Instead of checking the value in Python after matching
+    re.sub(r"\\d+", lambda m: "1" if 200 <= int(m[0]) < 650 else "0", s)
+generate a regex that only matches numbers in the range
+    range_regex(200, 649) -> (?<!\\d)(?:[2-5]\\d{2}|6[0-4]\\d)(?!\\d)
+Each digit length in the range is handled on its own, then a same length
+range is split on the first digit that differs:
+    lower edge, full middle block, upper edge
+Only non-negative integers, lo and hi are both inclusive
+"""
+
+
+def _same_length(a, b):
+    """Regex for the numbers from a to b, given as strings of equal length"""
+    if a == b:
+        return a
+    if len(a) == 1:
+        return f"[{a}-{b}]"
+    if a[0] == b[0]:
+        return a[0] + _group(_same_length(a[1:], b[1:]))
+
+    n = len(a) - 1
+    parts = []
+    low, high = int(a[0]), int(b[0])
+    if a[1:] != "0" * n:
+        parts.append(a[0] + _group(_same_length(a[1:], "9" * n)))
+        low += 1
+    upper = None
+    if b[1:] != "9" * n:
+        upper = b[0] + _group(_same_length("0" * n, b[1:]))
+        high -= 1
+    if low <= high:
+        digit = str(low) if low == high else f"[{low}-{high}]"
+        parts.append(digit + (r"\d" if n == 1 else rf"\d{{{n}}}"))
+    if upper:
+        parts.append(upper)
+    return "|".join(parts)
+
+
+def _group(regex):
+    return f"(?:{regex})" if "|" in regex else regex
+
+
+def range_regex(lo, hi=None, leading_zeros=False, boundary="digits"):
+    """Regex string matching the integers lo to hi (inclusive)
+
+    hi=None means no upper limit
+    leading_zeros=True also matches forms like 007 for 7
+    boundary: "digits" -> not part of a longer number, (?<!\\d) and (?!\\d)
+              "word"   -> \\b on both sides
+              None     -> no boundary checks
+    """
+    if lo < 0 or (hi is not None and hi < lo):
+        raise ValueError("need 0 <= lo <= hi")
+    parts = []
+    lo_len = len(str(lo))
+    hi_len = len(str(hi)) if hi is not None else lo_len
+    for length in range(lo_len, hi_len + 1):
+        first = 10 ** (length - 1) if length > 1 else 0
+        last = 10**length - 1
+        a = max(lo, first)
+        b = last if hi is None else min(hi, last)
+        parts.append(_same_length(str(a), str(b)))
+    if hi is None:
+        parts.append(rf"[1-9]\d{{{lo_len},}}")
+
+    regex = "|".join(parts)
+    if leading_zeros:
+        regex = "0*" + _group(regex)
+    elif len(parts) > 1 or "|" in regex:
+        regex = f"(?:{regex})"
+    if boundary == "digits":
+        return rf"(?<!\d){regex}(?!\d)"
+    if boundary == "word":
+        return rf"\b{regex}\b"
+    if boundary is None:
+        return regex
+    raise ValueError(f"unknown boundary: {boundary!r}")
+
+
+if __name__ == "__main__":
+    print(range_regex(200, 649))
+    # (?<!\d)(?:[2-5]\d{2}|6[0-4]\d)(?!\d)
+
+    # Numbers that num_range() would turn into "1", without int() per match
+    print(re.findall(range_regex(200, 649), "45 349 651 593 4 204"))
+    # ['349', '593', '204']
+
+    # Any number greater than 624
+    items = ["hi42bye", "nice1423", "bad-300", "cool-625"]
+    gt624 = re.compile(range_regex(625))
+    print([i for i in items if gt624.search(i)])
+    # ['nice1423', 'cool-625']
+
+    print(re.findall(range_regex(7, 12, leading_zeros=True), "7 007 12 013 0"))
+    # ['7', '007', '12']
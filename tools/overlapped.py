@@ -0,0 +1,181 @@
+import re
+from functools import lru_cache
+
+from redos import REPEATS, charset, children, nullable, op_name
+
+try:
+    from re import _compiler as sre_compile
+    from re import _parser as sre_parse
+    from re._constants import ASSERT, IN, SUBPATTERN
+except ImportError:
+    import sre_compile
+    import sre_parse
+    from sre_constants import ASSERT, IN, SUBPATTERN
+
+###########################
+#   Overlapped matching   #
+###########################
+"""
+regex.findall(r"\\w\\w", "apple", overlapped=True) -> ['ap', 'pp', 'pl', 'le']
+With re, the usual trick is finditer() over r"(?=(\\w\\w))", which tries the
+pattern at every single offset and shifts the pattern's own groups by one
+Here the pattern is wrapped at the parse tree level instead:
+    F(?<=(?=PATTERN())F)
+F is a class of the characters that can start a match, worked out from
+the pattern, so re's own search can jump straight to the next possible
+start (same as it does for [abc]... patterns), then the lookahead runs the
+pattern from there and the empty group at the end marks where it stopped
+The group comes after all of the pattern's groups, so \\1 etc still refer
+to the right group
+Without a usable F (pattern can match empty, starts with a backreference,
+., a negated class etc) the wrapper is just (?=PATTERN())
+Like regex, the next match is looked for one character after the start of
+the previous one
+findall() uses the wrapper's own findall(), no Match objects are made:
+without groups the empty group is a capture group around PATTERN instead
+    F(?<=(?=(PATTERN))F)
+so each result is the matched text, with groups there's no extra group
+"""
+
+
+def _lead(seq, flags):
+    """Character items that can start a match of seq, None if unknown"""
+    items = []
+    for item in seq:
+        op, av = item
+        name = op_name(op)
+        if charset(item, flags) is not None:
+            return items + [item]
+        if name in ("AT", "ASSERT", "ASSERT_NOT"):
+            # Zero width, only restricts where the first character can be
+            continue
+        if name in REPEATS or name == "BRANCH" or (name == "SUBPATTERN" and av[1] == av[2] == 0):
+            for sub, _, _ in children(item):
+                sub_items = _lead(sub, flags) if sub else None
+                if sub_items is None:
+                    return None
+                items += sub_items
+            if name in REPEATS and av[0] == 0:
+                continue
+            return items
+        return None
+    return None
+
+
+def _first_class(items, state):
+    """One IN item matching any of items, None if they can't be merged
+
+    With IGNORECASE, re can't use the class to skip ahead, but it's still
+    a cheap check before the lookahead runs
+    """
+    members = []
+    for op, av in items:
+        name = op_name(op)
+        if name == "LITERAL":
+            members.append((op, av))
+        elif name == "IN" and not any(op_name(sub_op) == "NEGATE" for sub_op, _ in av):
+            members.extend(av)
+        else:
+            return None
+    return (IN, members)
+
+
+@lru_cache(maxsize=256)
+def _wrapper(pat, group="end"):
+    """Return (wrapper pattern, group number marking the end of each match)
+
+    group="whole" makes the group hold the whole match instead of being
+    empty, with group=None there's no extra group (and None is returned)
+    """
+    parsed = sre_parse.parse(pat.pattern, pat.flags)
+    state = parsed.state
+    flags = state.flags
+    seq = list(parsed)
+    first = None
+    if not nullable(seq, flags):
+        items = _lead(seq, flags)
+        if items:
+            first = _first_class(items, state)
+
+    end_group = None if group is None else state.opengroup()
+    if group is None:
+        body = seq
+    elif group == "whole":
+        inner = sre_parse.SubPattern(state, seq)
+        state.closegroup(end_group, inner)
+        body = [(SUBPATTERN, (end_group, 0, 0, inner))]
+    else:
+        empty = sre_parse.SubPattern(state, [])
+        state.closegroup(end_group, empty)
+        body = seq + [(SUBPATTERN, (end_group, 0, 0, empty))]
+    look = (ASSERT, (1, sre_parse.SubPattern(state, body)))
+    if first is None:
+        wrapped = [look]
+    else:
+        wrapped = [first, (ASSERT, (-1, sre_parse.SubPattern(state, [look, first])))]
+    return sre_compile.compile(sre_parse.SubPattern(state, wrapped), flags), end_group
+
+
+def _compile(pattern, flags):
+    return pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+
+
+def _wrapper_matches(pat, string, pos, endpos):
+    wrapper, end_group = _wrapper(pat)
+    return wrapper.finditer(string, pos, len(string) if endpos is None else endpos), end_group
+
+
+def finditer(pattern, string, pos=0, endpos=None, flags=0):
+    """Overlapped matches of pattern as Match objects
+
+    Each start found by the wrapper is matched again with pattern.match(),
+    spans() and findall() are faster when a Match object isn't needed
+    """
+    pat = _compile(pattern, flags)
+    matches, _ = _wrapper_matches(pat, string, pos, endpos)
+    endpos = len(string) if endpos is None else endpos
+    match = pat.match
+    for m in matches:
+        yield match(string, m.start(), endpos)
+
+
+def starts(pattern, string, pos=0, endpos=None, flags=0):
+    """Lazily yield every offset where a match of pattern starts"""
+    pat = _compile(pattern, flags)
+    matches, _ = _wrapper_matches(pat, string, pos, endpos)
+    for m in matches:
+        yield m.start()
+
+
+def spans(pattern, string, pos=0, endpos=None, flags=0):
+    """[(start, end), ...] of overlapped matches"""
+    pat = _compile(pattern, flags)
+    matches, end_group = _wrapper_matches(pat, string, pos, endpos)
+    return [(m.start(), m.end(end_group)) for m in matches]
+
+
+def findall(pattern, string, pos=0, endpos=None, flags=0):
+    """Same as regex.findall(pattern, string, overlapped=True)
+
+    i.e. like re.findall(): whole matches without groups, group 1 with one
+    group, tuples of groups with more, "" for groups that didn't match
+    """
+    pat = _compile(pattern, flags)
+    endpos = len(string) if endpos is None else endpos
+    wrapper, _ = _wrapper(pat, "whole" if pat.groups == 0 else None)
+    return wrapper.findall(string, pos, endpos)
+
+
+if __name__ == "__main__":
+    print(findall(r"\w\w", "apple banana"))
+    # ['ap', 'pp', 'pl', 'le', 'ba', 'an', 'na', 'an', 'na']
+
+    print(spans(r"(?i)an.", "bANana"))
+    # [(1, 4), (3, 6)]
+
+    # Groups and backreferences keep their numbers
+    print(findall(r"(\w)\1(\w)", "aabbcc"))
+    # [('a', 'b'), ('b', 'c')]
+
+    print([m.span() for m in finditer(r"\d+", "a123")])
+    # [(1, 4), (2, 4), (3, 4)]
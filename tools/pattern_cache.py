@@ -0,0 +1,187 @@
+import re
+import threading
+from collections import OrderedDict
+from time import perf_counter
+
+from literal import LiteralPattern
+from literal import compile as literal_compile
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+#####################
+#   Pattern cache   #
+#####################
+"""
+re.search(r"...", s) etc compile the pattern behind the scenes and keep it
+in a small internal cache that can't be sized or inspected
+PatternCache makes that explicit:
+    key is (pattern, flags, backend), backend is "re" or "regex"
+    least recently used pattern is evicted once maxsize is reached
+    hits, misses and total compile time are counted
+    warm() compiles a list of patterns up front, e.g. at startup
+With literals=True, patterns without metacharacters compile to a
+LiteralPattern (see literal.py) that uses str.find()/str.replace()
+"""
+
+BACKENDS = {"re": re}
+if regex is not None:
+    BACKENDS["regex"] = regex
+
+
+class PatternCache:
+    def __init__(self, maxsize=1024, literals=True):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.literals = literals
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.literal_compiles = 0
+        self.compile_time = 0.0
+
+    def compile(self, pattern, flags=0, backend="re"):
+        """Return the compiled pattern, compiling it on a cache miss"""
+        key = (type(pattern), pattern, flags, backend)
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return compiled
+
+        try:
+            module = BACKENDS[backend]
+        except KeyError:
+            raise ValueError(f"unknown or unavailable backend: {backend!r}") from None
+        start = perf_counter()
+        if self.literals and module is re:
+            compiled = literal_compile(pattern, flags)
+        else:
+            compiled = module.compile(pattern, flags)
+        elapsed = perf_counter() - start
+
+        with self._lock:
+            self.misses += 1
+            self.literal_compiles += isinstance(compiled, LiteralPattern)
+            self.compile_time += elapsed
+            self._cache[key] = compiled
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return compiled
+
+    def warm(self, patterns, flags=0, backend="re"):
+        """Compile patterns ahead of use
+
+        Items can be a pattern or a (pattern, flags) or (pattern, flags, backend)
+        tuple, in which case the arguments act as defaults
+        """
+        for item in patterns:
+            if isinstance(item, tuple):
+                self.compile(*item)
+            else:
+                self.compile(item, flags, backend)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "literal_compiles": self.literal_compiles,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "compile_time": self.compile_time,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = self.evictions = self.literal_compiles = 0
+            self.compile_time = 0.0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, item):
+        """Accepts a pattern or a (pattern, flags[, backend]) tuple, like warm()"""
+        if not isinstance(item, tuple):
+            item = (item,)
+        pattern, flags, backend = item + (0, "re")[len(item) - 1 :]
+        return (type(pattern), pattern, flags, backend) in self._cache
+
+
+###########################
+#   Module level helpers  #
+###########################
+"""
+Drop in replacements for re.search() and friends that go through a shared
+PatternCache instead of re's internal one
+"""
+
+default_cache = PatternCache()
+
+
+def compile(pattern, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend)
+
+
+def search(pattern, string, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend).search(string)
+
+
+def match(pattern, string, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend).match(string)
+
+
+def fullmatch(pattern, string, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend).fullmatch(string)
+
+
+def findall(pattern, string, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend).findall(string)
+
+
+def finditer(pattern, string, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend).finditer(string)
+
+
+def split(pattern, string, maxsplit=0, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend).split(string, maxsplit)
+
+
+def sub(pattern, repl, string, count=0, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend).sub(repl, string, count)
+
+
+def subn(pattern, repl, string, count=0, flags=0, backend="re"):
+    return default_cache.compile(pattern, flags, backend).subn(repl, string, count)
+
+
+if __name__ == "__main__":
+    default_cache.warm([r"tt", r"at", (r"this", re.I)])
+
+    words = ["cat", "attempt", "tattle"]
+    print([w for w in words if search(r"tt", w)])
+    # ['attempt', 'tattle']
+    print(bool(search(r"this", "This is a sample string", flags=re.I)))
+    # True
+    print(sub(r"e", "E", "Have a nice weekend", count=2))
+    # HavE a nicE weekend
+
+    print({k: v for k, v in default_cache.stats().items() if k != "compile_time"})
+    # {'size': 4, 'maxsize': 1024, 'hits': 4, 'misses': 4, 'evictions': 0, 'literal_compiles': 4, 'hit_rate': 0.5}
+
+    small = PatternCache(maxsize=2)
+    for p in ["a", "b", "a", "c", "b"]:
+        small.compile(p)
+    print(small.hits, small.misses, small.evictions, "a" in small, "b" in small)
+    # 1 4 2 False True
@@ -0,0 +1,396 @@
+import re
+from collections import namedtuple
+
+from redos import CATEGORIES, REPEATS, charset, children, nullable, op_name, quantifier_spans, repeats_preorder
+
+try:
+    from re import _parser as sre_parse
+    from re._constants import MAXREPEAT
+except ImportError:
+    import sre_parse
+    from sre_constants import MAXREPEAT
+
+###############################
+#   Possessive quantifiers    #
+###############################
+"""
+0*+\\d{3,} or (a+|\\w+)*+: in place of the greedy versions stops the engine
+from trying every way of giving characters back, but changing a greedy
+quantifier to possessive is only safe when giving back can never help
+optimize() adds the + where it can prove that, i.e. for a greedy repeat
+    X is a single character class C, or an unbounded repeat of something
+      that matches any one character of C and nothing outside C*
+      so the greedy repeat always stops at the end of a run of C
+    no character of C can start whatever follows (the rest of the pattern,
+      including another iteration of enclosing repeats)
+Giving characters back then leaves the next part of the pattern facing a
+character of C, which it can't match, so the match result is unchanged
+Lookarounds, backreferences and anchors other than $ and \\Z after the
+repeat are not analysed and block the rewrite
+Character sets are exact for literals, ranges, and categories with re.ASCII
+or bytes patterns, Unicode categories only for ASCII characters: \\d and
+[^\\x00-\\x7f] might share a character ('٣'), so \\d+[^\\x00-\\x7f] is left
+alone while \\d+: and (?a)\\d+[^\\x00-\\x7f] are rewritten
+0* in 0*\\d{3,} is left alone: \\d can match the 0 that 0* would give back,
+and 0*+\\d{3,} doesn't match '0012'
+Possessive quantifiers need Python 3.11+, re.X patterns aren't rewritten
+"""
+
+Rewrite = namedtuple("Rewrite", "span before after")
+
+
+_Set = namedtuple("_Set", "ranges unknown")
+_Set.__doc__ = """Characters as sorted (lo, hi) code point ranges
+
+unknown has the names of Unicode categories whose non-ASCII part is also
+included, those parts aren't worked out
+"""
+_EMPTY = _Set((), frozenset())
+
+
+def _merge(ranges):
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(hi, merged[-1][1]))
+        else:
+            merged.append((lo, hi))
+    return tuple(merged)
+
+
+def _union(*sets):
+    return _Set(_merge(r for s in sets for r in s.ranges), frozenset().union(*(s.unknown for s in sets)))
+
+
+def _invert(ranges, top):
+    result = []
+    lo = 0
+    for start, end in ranges:
+        if start > lo:
+            result.append((lo, start - 1))
+        lo = end + 1
+    if lo <= top:
+        result.append((lo, top))
+    return tuple(result)
+
+
+def _non_ascii(s):
+    return bool(s.unknown) or any(hi >= 0x80 for _, hi in s.ranges)
+
+
+def _disjoint(a, b):
+    """True only if no character can be in both"""
+    if (a.unknown and _non_ascii(b)) or (b.unknown and _non_ascii(a)):
+        return False
+    i = j = 0
+    while i < len(a.ranges) and j < len(b.ranges):
+        (lo1, hi1), (lo2, hi2) = a.ranges[i], b.ranges[j]
+        if lo1 <= hi2 and lo2 <= hi1:
+            return False
+        if hi1 < hi2:
+            i += 1
+        else:
+            j += 1
+    return True
+
+
+def _covers(big, small):
+    """True if every character of small is provably in big"""
+    if not small.unknown <= big.unknown:
+        return False
+    return all(any(lo <= a and b <= hi for lo, hi in big.ranges) for a, b in small.ranges)
+
+
+class _Chars:
+    """Sets of characters class items match, see _Set
+
+    __call__ gives a superset of the characters an item can match, under()
+    a subset of them, both exact for literals, ranges and categories with
+    re.ASCII or bytes patterns
+    Unicode categories are exact for ASCII characters only, and with
+    IGNORECASE non-ASCII characters are assumed to match any letter
+    """
+
+    def __init__(self, parsed):
+        # state.str is the pattern itself
+        self.str = isinstance(parsed.state.str, str)
+        self.top = 0x10FFFF if self.str else 0xFF
+        self._cache = {}
+
+    def __call__(self, item, flags):
+        return self._get(item, flags, False)
+
+    def under(self, item, flags):
+        return self._get(item, flags, True)
+
+    def _get(self, item, flags, under):
+        key = (id(item), flags, under)
+        if key not in self._cache:
+            self._cache[key] = self._item(item, flags, under)
+        return self._cache[key]
+
+    def _complement(self, s, under):
+        ranges = _invert(s.ranges, self.top)
+        if under and s.unknown:
+            # Keep only what's certainly outside s
+            ranges = tuple((lo, min(hi, 0x7F)) for lo, hi in ranges if lo < 0x80)
+        return _Set(ranges, frozenset())
+
+    def _item(self, item, flags, under):
+        op, av = item
+        name = op_name(op)
+        if name == "LITERAL":
+            return self._range(av, av, flags, under)
+        if name == "NOT_LITERAL":
+            return self._complement(self._range(av, av, flags, not under), under)
+        if name == "ANY":
+            return _Set(((0, self.top),) if flags & re.S else ((0, 9), (11, self.top)), frozenset())
+        if name == "IN":
+            negate = any(op_name(sub_op) == "NEGATE" for sub_op, _ in av)
+            members = [
+                self._member(sub_op, sub_av, flags, under != negate) for sub_op, sub_av in av if op_name(sub_op) != "NEGATE"
+            ]
+            result = _union(_EMPTY, *members)
+            return self._complement(result, under) if negate else result
+        return None
+
+    def _member(self, op, av, flags, under):
+        name = op_name(op)
+        if name == "LITERAL":
+            return self._range(av, av, flags, under)
+        if name == "RANGE":
+            return self._range(av[0], av[1], flags, under)
+        if name == "CATEGORY":
+            return self._category(op_name(av), flags, under)
+        return _EMPTY if under else _Set(((0, self.top),), frozenset())
+
+    def _range(self, lo, hi, flags, under):
+        exact = _Set(((lo, hi),), frozenset())
+        if under or not flags & re.I:
+            return exact
+        everything = _Set(((0, self.top),), frozenset())
+        if flags & re.L or (self.str and not flags & re.A and hi >= 0x80):
+            return everything
+        cased = [ord(chr(c).swapcase()) for c in range(lo, min(hi, 0x7F) + 1) if chr(c).isalpha()]
+        if cased and self.str and not flags & re.A:
+            # e.g. K (Kelvin sign) matches k, ſ matches s
+            return _Set(_merge([(lo, hi), (0x80, self.top)] + [(c, c) for c in cased]), frozenset())
+        return _Set(_merge([(lo, hi)] + [(c, c) for c in cased]), frozenset())
+
+    def _category(self, name, flags, under):
+        if name not in CATEGORIES or flags & re.L:
+            return _EMPTY if under else _Set(((0, self.top),), frozenset())
+        unicode = self.str and not flags & re.A
+        codes = range(0x80 if self.str else 0x100)
+        if self.str:
+            cat = re.compile(CATEGORIES[name], flags & (re.A | re.U))
+            found = [c for c in codes if cat.match(chr(c))]
+        else:
+            cat = re.compile(CATEGORIES[name].encode())
+            found = [c for c in codes if cat.match(bytes([c]))]
+        ranges = _merge((c, c) for c in found)
+        if unicode:
+            return _Set(ranges, frozenset([name]))
+        if self.str and cat.match("\x80"):
+            # Negated categories with re.ASCII match every non-ASCII character
+            ranges = _merge(ranges + ((0x80, self.top),))
+        return _Set(ranges, frozenset())
+
+
+def _lead(seq, flags, chars):
+    """Characters that can start a match of seq, None if that can't be worked out"""
+    result = _EMPTY
+    for item in seq:
+        lead = _item_lead(item, flags, chars)
+        if lead is None:
+            return None
+        result = _union(result, lead)
+        if not nullable([item], flags):
+            break
+    return result
+
+
+def _item_lead(item, flags, chars):
+    op, av = item
+    name = op_name(op)
+    if charset(item, flags) is not None:
+        return chars(item, flags)
+    if name in REPEATS:
+        return _lead(av[2], flags, chars) if av[1] > 0 else _EMPTY
+    if name == "BRANCH":
+        leads = [_lead(alt, flags, chars) for alt in av[1]]
+        return None if None in leads else _union(_EMPTY, *leads)
+    if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+        seq, add, remove = children(item)[0]
+        return _lead(seq, (flags | add) & ~remove, chars)
+    if name == "AT":
+        at = op_name(av)
+        if at == "AT_END":
+            return _Set(((10, 10),), frozenset())
+        if at == "AT_END_STRING":
+            return _EMPTY
+    return None
+
+
+def _then(lead, is_nullable, after):
+    """Lead characters of an item followed by something with lead characters after"""
+    if lead is None or (is_nullable and after is None):
+        return None
+    return _union(lead, after) if is_nullable else lead
+
+
+def _consumed(seq, flags, chars):
+    """Characters seq can consume, None if seq has anything but classes, repeats and groups"""
+    result = _EMPTY
+    for item in seq:
+        op, av = item
+        name = op_name(op)
+        if charset(item, flags) is not None:
+            result = _union(result, chars(item, flags))
+            continue
+        if name in REPEATS or name in ("SUBPATTERN", "ATOMIC_GROUP", "BRANCH"):
+            for sub, add, remove in children(item):
+                sub_chars = _consumed(sub, (flags | add) & ~remove, chars)
+                if sub_chars is None:
+                    return None
+                result = _union(result, sub_chars)
+            continue
+        return None
+    return result
+
+
+def _single(seq, flags, chars):
+    """Characters c for which seq can match just "c" (a subset of them)"""
+    result = _EMPTY
+    for index, item in enumerate(seq):
+        others = list(seq[:index]) + list(seq[index + 1 :])
+        if all(op_name(op) in REPEATS and av[0] == 0 for op, av in others):
+            result = _union(result, _item_single(item, flags, chars))
+    return result
+
+
+def _item_single(item, flags, chars):
+    op, av = item
+    name = op_name(op)
+    if charset(item, flags) is not None:
+        return chars.under(item, flags)
+    if name in REPEATS and av[0] <= 1 <= av[1]:
+        return _single(av[2], flags, chars)
+    if name == "BRANCH":
+        return _union(_EMPTY, *(_single(alt, flags, chars) for alt in av[1]))
+    if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+        seq, add, remove = children(item)[0]
+        return _single(seq, (flags | add) & ~remove, chars)
+    return _EMPTY
+
+
+def _possessive_safe(item, flags, after, chars):
+    op, av = item
+    low, high, body = av
+    if op_name(op) != "MAX_REPEAT" or low == high or after is None:
+        return False
+    consumed = _consumed(body, flags, chars)
+    if consumed is None or consumed == _EMPTY or not _disjoint(consumed, after):
+        return False
+    if len(body) == 1 and charset(body[0], flags) is not None:
+        return True
+    # Every character of the run has to be matchable on its own, otherwise
+    # the greedy repeat could stop before the end of the run, and with
+    # {2,} etc a run can be too short until it's split into more iterations
+    return (
+        low <= 1
+        and high == MAXREPEAT
+        and not nullable(body, flags)
+        and _covers(_single(body, flags, chars), consumed)
+    )
+
+
+def _walk(seq, flags, after, chars, found):
+    """Collect greedy repeats in seq that can be made possessive
+
+    after has the lead characters of whatever follows seq
+    """
+    follows = []
+    for item in reversed(seq):
+        follows.append(after)
+        after = _then(_item_lead(item, flags, chars), nullable([item], flags), after)
+    follows.reverse()
+
+    for item, follow in zip(seq, follows):
+        op, av = item
+        name = op_name(op)
+        if name in REPEATS:
+            if _possessive_safe(item, flags, follow, chars):
+                found.append(item)
+            body_after = follow if av[1] <= 1 else _then(_lead(av[2], flags, chars), True, follow)
+            _walk(av[2], flags, body_after, chars, found)
+        elif name in ("SUBPATTERN", "ATOMIC_GROUP", "BRANCH"):
+            for sub, add, remove in children(item):
+                _walk(sub, (flags | add) & ~remove, follow, chars, found)
+        elif name == "ASSERT" or name == "ASSERT_NOT":
+            # Lookaheads succeed once their end is reached, lookbehinds are skipped
+            if av[0] == 1:
+                _walk(av[1], flags, _EMPTY, chars, found)
+
+
+def optimize(pattern, flags=0):
+    """Return (pattern, rewrites) with greedy quantifiers made possessive where safe
+
+    rewrites is a list of Rewrite(span, before, after), span is the position
+    of the quantified part in the original pattern
+    """
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags
+    parsed = sre_parse.parse(pattern, flags)
+    flags = parsed.state.flags
+    if flags & re.X:
+        return pattern, []
+    repeats = list(repeats_preorder(parsed))
+    spans = quantifier_spans(pattern)
+    if len(spans) != len(repeats):
+        # The parser merged or dropped some quantifiers, spans can't be trusted
+        return pattern, []
+    span_of = {id(item): span for item, span in zip(repeats, spans)}
+
+    found = []
+    _walk(list(parsed), flags, _EMPTY, _Chars(parsed), found)
+
+    plus = b"+" if isinstance(pattern, bytes) else "+"
+    rewrites = []
+    result = pattern
+    for end in sorted((span_of[id(item)][1] for item in found), reverse=True):
+        result = result[:end] + plus + result[end:]
+    for start, end in sorted(span_of[id(item)] for item in found):
+        before = pattern[start:end]
+        rewrites.append(Rewrite((start, end), before, before + plus))
+    return result, rewrites
+
+
+def compile(pattern, flags=0, report=None):
+    """re.compile() of the optimized pattern
+
+    report, if given, is called with each Rewrite, e.g. report=print
+    """
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags
+    optimized, rewrites = optimize(pattern, flags)
+    if report is not None:
+        for rewrite in rewrites:
+            report(rewrite)
+    return re.compile(optimized, flags)
+
+
+if __name__ == "__main__":
+    for p in (r"(a+|\w+)*:", r"0*\d{3,}", r"\d+,\d+", r"[a-z]+\d*\.txt", r"<[^>]*>", r"(\d+\s?)*$"):
+        print(p, "->", optimize(p)[0])
+    # (a+|\w+)*: -> (a+|\w+)*+:
+    # 0*\d{3,} -> 0*\d{3,}+
+    # \d+,\d+ -> \d++,\d++
+    # [a-z]+\d*\.txt -> [a-z]++\d*+\.txt
+    # <[^>]*> -> <[^>]*+>
+    # (\d+\s?)*$ -> (\d+\s?)*$
+
+    pat = compile(r"(a+|\w+)*:", report=print)
+    # Rewrite(span=(0, 9), before='(a+|\\w+)*', after='(a+|\\w+)*+')
+    print(pat.search("aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa-123"))
+    # None
@@ -0,0 +1,658 @@
+import re
+import string
+from collections import namedtuple
+
+try:
+    from re import _compiler as sre_compile
+    from re import _parser as sre_parse
+    from re._constants import MAXREPEAT
+except ImportError:
+    import sre_compile
+    import sre_parse
+    from sre_constants import MAXREPEAT
+
+######################
+#   ReDoS analysis   #
+######################
+"""
+Catastrophic backtracking, e.g. r"(a+|\\w+)*:" on "aaaaaaaaaaaaaaaa-123"
+The pattern is parsed with re's own parser and the tree is checked for:
+    exponential -> an unbounded repeat whose body can match the same text
+                   in more than one way:
+                   (a+|\\w+)*  alternatives that overlap
+                   (a|a)*      alternatives that match the same text (re
+                               parses it as a(?:|), two empty alternatives)
+                   (a|b|ab)*   an alternative's text is also a sequence of
+                               matches of the others
+                   (a+)+       body matches runs of "a" of different lengths
+                   (a|aa)+     same
+                   or a bounded repeat of at least LARGE_REPEAT with the
+                   same problems, or with a body that can match empty:
+                   (a?){25}a{25} has 2**25 ways to split 25 "a"s
+    polynomial  -> two unbounded repeats in a row that can match the same
+                   characters, e.g. \\d+\\d+ or .*.*=
+A repeat is only a problem when something can make the match fail after
+it: the rest of the pattern, the end of the input with fullmatch=True, or
+the repeat's own minimum count, (.*a){12} fails on input with 11 "a"s
+Character sets are worked out over a sample alphabet, so the analysis is
+a heuristic: it errs on the side of reporting
+Possessive quantifiers and atomic groups don't backtrack and aren't reported
+Each finding has the span of the offending part of the pattern and a
+witness: text that reaches the repeat, pumps it, then fails
+"""
+
+Finding = namedtuple("Finding", "kind span fragment witness message")
+
+UNIVERSE = string.ascii_letters + string.digits + string.punctuation + " \t\n" + "éß\u00a0"
+# Preferred characters for making a match fail
+FAIL_CHARS = "!#-@ ;\n\x00"
+
+REPEATS = ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+CATEGORIES = {
+    "CATEGORY_DIGIT": r"\d",
+    "CATEGORY_NOT_DIGIT": r"\D",
+    "CATEGORY_WORD": r"\w",
+    "CATEGORY_NOT_WORD": r"\W",
+    "CATEGORY_SPACE": r"\s",
+    "CATEGORY_NOT_SPACE": r"\S",
+}
+
+
+class UnsafePattern(ValueError):
+    def __init__(self, pattern, findings):
+        super().__init__(f"{pattern!r}: " + "; ".join(f.message for f in findings))
+        self.pattern = pattern
+        self.findings = findings
+
+
+###########################
+#   Parse tree helpers    #
+###########################
+"""
+Shared with possessive.py and fuzzer.py
+A "sequence" is a list of (op, av) items as returned by re._parser.parse()
+"""
+
+
+def op_name(op):
+    return str(op)
+
+
+def parse(pattern, flags=0):
+    """Return (sequence, flags) with the pattern's inline global flags applied"""
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags
+    parsed = sre_parse.parse(pattern, flags)
+    return list(parsed), parsed.state.flags
+
+
+def _with_case(chars, flags):
+    if flags & re.I:
+        chars = chars | {c.swapcase() for c in chars if len(c.swapcase()) == 1}
+    return chars & set(UNIVERSE)
+
+
+def charset(item, flags):
+    """Set of UNIVERSE characters a single character item matches, else None"""
+    op, av = item
+    name = op_name(op)
+    if name == "LITERAL":
+        return _with_case({chr(av)}, flags)
+    if name == "NOT_LITERAL":
+        return set(UNIVERSE) - _with_case({chr(av)}, flags)
+    if name == "ANY":
+        return set(UNIVERSE) if flags & re.S else set(UNIVERSE) - {"\n"}
+    if name == "IN":
+        chars = set()
+        negate = False
+        for sub_op, sub_av in av:
+            sub_name = op_name(sub_op)
+            if sub_name == "NEGATE":
+                negate = True
+            elif sub_name == "RANGE":
+                chars |= {c for c in UNIVERSE if sub_av[0] <= ord(c) <= sub_av[1]}
+            elif sub_name == "CATEGORY":
+                cat = re.compile(CATEGORIES.get(op_name(sub_av), r"(?!)"), flags & (re.A | re.U))
+                chars |= {c for c in UNIVERSE if cat.match(c)}
+            else:
+                chars |= charset((sub_op, sub_av), flags) or set()
+        chars = _with_case(chars, flags)
+        return set(UNIVERSE) - chars if negate else chars
+    return None
+
+
+def children(item):
+    """Sub-sequences of an item, with the flags changes a group applies"""
+    op, av = item
+    name = op_name(op)
+    if name in REPEATS:
+        return [(av[2], 0, 0)]
+    if name == "SUBPATTERN":
+        return [(av[3], av[1], av[2])]
+    if name == "ATOMIC_GROUP":
+        return [(av, 0, 0)]
+    if name == "BRANCH":
+        return [(alt, 0, 0) for alt in av[1]]
+    if name in ("ASSERT", "ASSERT_NOT"):
+        return [(av[1], 0, 0)]
+    if name == "GROUPREF_EXISTS":
+        return [(seq, 0, 0) for seq in av[1:] if seq is not None]
+    return []
+
+
+def nullable(seq, flags=0):
+    return all(_item_nullable(item, flags) for item in seq)
+
+
+def _item_nullable(item, flags):
+    op, av = item
+    name = op_name(op)
+    if charset(item, flags) is not None:
+        return False
+    if name in REPEATS:
+        return av[0] == 0 or nullable(av[2], flags)
+    if name == "BRANCH":
+        return any(nullable(alt, flags) for alt in av[1])
+    if name == "GROUPREF_EXISTS":
+        return any(seq is None or nullable(seq, flags) for seq in av[1:])
+    if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+        seq, add, remove = children(item)[0]
+        return nullable(seq, (flags | add) & ~remove)
+    # Anchors, lookarounds and backreferences can all match empty
+    return True
+
+
+def pump(seq, flags=0):
+    """Characters c such that seq can match some non-empty run of c only"""
+    result = set()
+    required = None
+    for item in seq:
+        chars = _item_pump(item, flags)
+        result |= chars
+        if not _item_nullable(item, flags):
+            required = chars if required is None else required & chars
+    return result if required is None else result & required
+
+
+def _item_pump(item, flags):
+    op, av = item
+    name = op_name(op)
+    chars = charset(item, flags)
+    if chars is not None:
+        return chars
+    if name in REPEATS:
+        return pump(av[2], flags) if av[1] > 0 else set()
+    if name == "BRANCH":
+        return set().union(*(pump(alt, flags) for alt in av[1]))
+    if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+        seq, add, remove = children(item)[0]
+        return pump(seq, (flags | add) & ~remove)
+    return set()
+
+
+def first(seq, flags=0):
+    """Characters that can start a match of seq"""
+    result = set()
+    for item in seq:
+        result |= _item_first(item, flags)
+        if not _item_nullable(item, flags):
+            break
+    return result
+
+
+def _item_first(item, flags):
+    op, av = item
+    name = op_name(op)
+    chars = charset(item, flags)
+    if chars is not None:
+        return chars
+    if name in REPEATS:
+        return first(av[2], flags) if av[1] > 0 else set()
+    if name == "BRANCH":
+        return set().union(*(first(alt, flags) for alt in av[1]))
+    if name == "GROUPREF_EXISTS":
+        return set().union(*(first(seq, flags) for seq in av[1:] if seq is not None))
+    if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+        seq, add, remove = children(item)[0]
+        return first(seq, (flags | add) & ~remove)
+    # Backreferences can start with anything
+    if name.startswith("GROUPREF"):
+        return set(UNIVERSE)
+    return set()
+
+
+def sample(seq, flags=0):
+    """A short string seq is likely to match"""
+    return "".join(_item_sample(item, flags) for item in seq)
+
+
+def _pick(chars):
+    for c in UNIVERSE:
+        if c in chars:
+            return c
+    return ""
+
+
+def _item_sample(item, flags):
+    op, av = item
+    name = op_name(op)
+    chars = charset(item, flags)
+    if chars is not None:
+        return _pick(chars)
+    if name in REPEATS:
+        return sample(av[2], flags) * av[0]
+    if name == "BRANCH":
+        return min((sample(alt, flags) for alt in av[1]), key=len)
+    if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+        seq, add, remove = children(item)[0]
+        return sample(seq, (flags | add) & ~remove)
+    return ""
+
+
+def fail_char(avoid):
+    """A character outside avoid, to make the rest of a match fail"""
+    for c in FAIL_CHARS + UNIVERSE:
+        if c not in avoid:
+            return c
+    return ""
+
+
+RUN_CAP = 4
+# Bounded repeats with at least this many iterations are checked too
+LARGE_REPEAT = 10
+
+
+def run_lengths(seq, c, flags=0):
+    """Lengths (capped at RUN_CAP) of the runs of c that seq can match"""
+    lengths = {0}
+    for item in seq:
+        item_lengths = _item_run_lengths(item, c, flags)
+        lengths = {min(a + b, RUN_CAP) for a in lengths for b in item_lengths}
+        if not lengths:
+            break
+    return lengths
+
+
+def _item_run_lengths(item, c, flags):
+    op, av = item
+    name = op_name(op)
+    chars = charset(item, flags)
+    if chars is not None:
+        return {1} if c in chars else set()
+    if name in ("MAX_REPEAT", "MIN_REPEAT"):
+        body = run_lengths(av[2], c, flags)
+        lengths = {0} if av[0] == 0 else set()
+        current = {0}
+        for times in range(1, min(av[1], RUN_CAP) + 1):
+            current = {min(a + b, RUN_CAP) for a in current for b in body}
+            if times >= av[0] or times == RUN_CAP:
+                lengths |= current
+        return lengths
+    if name == "POSSESSIVE_REPEAT":
+        # Takes as much of the run as it can, only one way to match
+        return {RUN_CAP} if run_lengths(av[2], c, flags) - {0} else {0}
+    if name == "BRANCH":
+        return set().union(*(run_lengths(alt, c, flags) for alt in av[1]))
+    if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+        seq, add, remove = children(item)[0]
+        lengths = run_lengths(seq, c, (flags | add) & ~remove)
+        if name == "ATOMIC_GROUP" and lengths:
+            return {max(lengths)}
+        return lengths
+    # Anchors, lookarounds, backreferences: assume they consume nothing
+    return {0}
+
+
+def is_unbounded(item):
+    op, av = item
+    return op_name(op) in ("MAX_REPEAT", "MIN_REPEAT") and av[1] == MAXREPEAT
+
+
+def is_large(item):
+    """A bounded repeat that can backtrack through many iterations"""
+    op, av = item
+    return op_name(op) in ("MAX_REPEAT", "MIN_REPEAT") and LARGE_REPEAT <= av[1] < MAXREPEAT
+
+
+def repeats_preorder(seq):
+    """Every repeat item in seq, outer ones before the ones nested in them"""
+    for item in seq:
+        if op_name(item[0]) in REPEATS:
+            yield item
+        for sub, _, _ in children(item):
+            yield from repeats_preorder(sub)
+
+
+######################
+#   Source spans     #
+######################
+
+
+def quantifier_spans(pattern):
+    """(start, end) of every quantified atom in the pattern source, by start
+
+    end includes the quantifier and any lazy/possessive modifier
+    """
+    if isinstance(pattern, bytes):
+        pattern = pattern.decode("latin-1")
+    quantifier = re.compile(r"\*|\+|\?|\{\d*,?\d*\}")
+    spans = []
+    stack = []
+    atom = None
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "\\":
+            atom = i
+            m = re.compile(r"\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|0[0-7]{0,2}|[1-9]\d?|.)", re.S).match(pattern, i)
+            i = m.end() if m else i + 1
+            continue
+        if c == "[":
+            atom = i
+            j = i + 1
+            if j < n and pattern[j] == "^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            i = j + 1
+            continue
+        if c == "(":
+            if pattern.startswith("(?#", i):
+                i = pattern.find(")", i) + 1 or n
+                continue
+            m = re.compile(r"\(\?[aiLmsux-]*\)|\(\?P=\w+\)").match(pattern, i)
+            if m:
+                # Inline flags aren't atoms, named backreferences are
+                atom = i if m[0].startswith("(?P=") else None
+                i = m.end()
+                continue
+            stack.append(i)
+            atom = None
+            m = re.compile(r"\((?:\?(?:P<\w+>|<\w+>|[:=!>]|<[=!]|[aiLmsux-]+:|\([^)]*\)))?").match(pattern, i)
+            i = m.end()
+            continue
+        if c == ")":
+            atom = stack.pop() if stack else None
+            i += 1
+            continue
+        if c == "|":
+            atom = None
+            i += 1
+            continue
+        m = quantifier.match(pattern, i)
+        if m and m[0] != "{}":
+            end = m.end()
+            if end < n and pattern[end] in "?+":
+                end += 1
+            if atom is not None:
+                spans.append((atom, end))
+            atom = None
+            i = end
+            continue
+        atom = i
+        i += 1
+    return sorted(spans)
+
+
+################
+#   Analysis   #
+################
+
+
+def can_fail(seq, flags=0):
+    """False if seq always matches (possibly empty) wherever it is tried"""
+    return any(_item_can_fail(item, flags) for item in seq)
+
+
+def _item_can_fail(item, flags):
+    op, av = item
+    name = op_name(op)
+    if not _item_nullable(item, flags):
+        return True
+    if name in REPEATS:
+        return av[0] > 0 and can_fail(av[2], flags)
+    if name == "BRANCH":
+        return all(can_fail(alt, flags) for alt in av[1])
+    if name in ("SUBPATTERN", "ATOMIC_GROUP"):
+        seq, add, remove = children(item)[0]
+        return can_fail(seq, (flags | add) & ~remove)
+    # Anchors, lookarounds, backreferences
+    return True
+
+
+def analyze(pattern, flags=0, pump_length=None, fullmatch=False):
+    """Return a list of Findings for pattern, empty if nothing looks risky
+
+    Backtracking only blows up if something after the repeats can fail, by
+    default the pattern is assumed to be used with search()/match(), with
+    fullmatch=True the end of the input counts as something that can fail
+    """
+    if isinstance(pattern, re.Pattern):
+        pattern, flags = pattern.pattern, pattern.flags
+    parsed = sre_parse.parse(pattern, flags)
+    seq, flags = list(parsed), parsed.state.flags
+
+    source = pattern.decode("latin-1") if isinstance(pattern, bytes) else pattern
+    fullmatchers = {}
+
+    def fullmatcher(alt):
+        """fullmatch() of one alternative on its own, None if it can't be compiled"""
+        if id(alt) not in fullmatchers:
+            try:
+                compiled = sre_compile.compile(sre_parse.SubPattern(parsed.state, alt), flags)
+                fullmatchers[id(alt)] = compiled.fullmatch
+            except re.error:
+                fullmatchers[id(alt)] = None
+        return fullmatchers[id(alt)]
+    repeats = list(repeats_preorder(seq))
+    spans = None if flags & re.X else quantifier_spans(pattern)
+    if spans is None or len(spans) != len(repeats):
+        spans = [(0, len(source))] * len(repeats)
+    span_of = {id(item): span for item, span in zip(repeats, spans)}
+
+    findings = []
+    reported = []
+
+    def finding(kind, span, witness, message):
+        findings.append(Finding(kind, span, source[span[0] : span[1]], witness, message))
+
+    def walk(seq, flags, prefix, after):
+        for index, item in enumerate(seq):
+            rest = list(seq[index + 1 :]) + after
+            op, av = item
+            name = op_name(op)
+
+            # A minimum of 2+ iterations can fail even with nothing after it
+            rest_fails = fullmatch or can_fail(rest, flags)
+            fails = name in REPEATS and (rest_fails or av[0] > 1)
+            risky = is_unbounded(item) and fails
+            if risky or (is_large(item) and fails):
+                _check_repeat(item, flags, prefix, rest, rest_fails)
+
+            # Adjacent unbounded repeats, possibly with something between
+            if risky and not _inside_reported(span_of[id(item)]):
+                chars = pump(av[2], flags)
+                for other_index in range(index + 1, len(seq)):
+                    other = seq[other_index]
+                    if is_unbounded(other):
+                        other_rest = list(seq[other_index + 1 :]) + after
+                        if not (fullmatch or can_fail(other_rest, flags)):
+                            break
+                        common = chars & pump(other[1][2], flags)
+                        if common:
+                            span = (span_of[id(item)][0], span_of[id(other)][1])
+                            c = _pick(common)
+                            count = pump_length or 500
+                            witness = prefix + c * count + fail_char(common | first(other_rest, flags))
+                            finding(
+                                "polynomial",
+                                span,
+                                witness,
+                                f"{source[span[0]:span[1]]!r} at {span}: quantifiers in a row "
+                                f"can both match {c!r}, O(n^2) backtracking",
+                            )
+                        break
+                    if not _item_nullable(other, flags):
+                        chars = chars & _item_pump(other, flags)
+                    if not chars:
+                        break
+
+            if name == "POSSESSIVE_REPEAT" or name == "ATOMIC_GROUP":
+                prefix += _item_sample(item, flags)
+                continue
+            for sub, add, remove in children(item):
+                if name in ("ASSERT", "ASSERT_NOT"):
+                    continue
+                walk(sub, (flags | add) & ~remove, prefix, rest)
+            prefix += _item_sample(item, flags)
+
+    def _inside_reported(span):
+        return any(a <= span[0] and span[1] <= b for a, b in reported)
+
+    def _check_repeat(item, flags, prefix, rest, rest_fails):
+        body = item[1][2]
+        span = span_of[id(item)]
+        avoid = first(rest, flags)
+        count = pump_length or 30
+        if not rest_fails:
+            # Only too few iterations make it fail
+            count = min(count, item[1][0] - 1)
+
+        # Alternatives that can match the same text
+        for branch in _branches(body):
+            alts = branch[1][1]
+            for i in range(len(alts)):
+                for j in range(i + 1, len(alts)):
+                    common = pump(alts[i], flags) & pump(alts[j], flags)
+                    if common:
+                        c = _pick(common)
+                        reported.append(span)
+                        finding(
+                            "exponential",
+                            span,
+                            prefix + c * count + fail_char(common | avoid),
+                            f"{source[span[0]:span[1]]!r} at {span}: alternatives inside a repeat "
+                            f"can both match {c!r}, exponential backtracking",
+                        )
+                        return
+                    # (a|a) is parsed as a(?:|), (ab|cd|ab) isn't factored at all
+                    text = sample(alts[i], flags)
+                    both_empty = nullable(alts[i], flags) and nullable(alts[j], flags)
+                    if both_empty or (text and text == sample(alts[j], flags)):
+                        text = sample(body, flags) or _pick(pump(body, flags))
+                        if not text:
+                            continue
+                        reported.append(span)
+                        finding(
+                            "exponential",
+                            span,
+                            prefix + text * count + fail_char(first(body, flags) | avoid),
+                            f"{source[span[0]:span[1]]!r} at {span}: alternatives inside a repeat "
+                            "can match the same text, exponential backtracking",
+                        )
+                        return
+
+            # (a|b|ab), (\w|ab): "ab" is also "a" then "b"
+            for i, alt in enumerate(alts):
+                text = sample(alt, flags)
+                others = [fullmatcher(other) for j, other in enumerate(alts) if j != i]
+                subject = text.encode("latin-1") if isinstance(pattern, bytes) else text
+                if text and fullmatcher(alt) and fullmatcher(alt)(subject) and _splits(subject, others):
+                    reported.append(span)
+                    finding(
+                        "exponential",
+                        span,
+                        prefix + text * count + fail_char(first(body, flags) | avoid),
+                        f"{source[span[0]:span[1]]!r} at {span}: alternatives inside a repeat "
+                        f"can match {text!r} in more than one way, exponential backtracking",
+                    )
+                    return
+
+        # Each of many iterations can match empty or not, e.g. (a?){25}
+        # (an unbounded repeat stops at the first empty iteration instead)
+        if is_large(item) and nullable(body, flags) and pump(body, flags):
+            c = _pick(pump(body, flags))
+            reported.append(span)
+            finding(
+                "exponential",
+                span,
+                prefix + c * count + fail_char({c} | avoid),
+                f"{source[span[0]:span[1]]!r} at {span}: up to {item[1][1]} iterations that can "
+                f"match {c!r} or nothing, exponential backtracking",
+            )
+            return
+
+        # Body can match a run of c in more than one length, e.g. (a+)+,
+        # (a|aa)+ or (x+x+)+, then a long run splits up in many ways
+        for c in sorted(pump(body, flags), key=UNIVERSE.index):
+            if len(run_lengths(body, c, flags) - {0}) > 1:
+                reported.append(span)
+                finding(
+                    "exponential",
+                    span,
+                    prefix + c * count + fail_char({c} | avoid),
+                    f"{source[span[0]:span[1]]!r} at {span}: repeated part can match runs "
+                    f"of {c!r} of different lengths, exponential backtracking",
+                )
+                return
+
+    walk(seq, flags, "", [])
+    return findings
+
+
+def _splits(text, fullmatchers):
+    """True if text is a run of one or more matches, each by one of fullmatchers"""
+    fullmatchers = [m for m in fullmatchers if m is not None]
+    ends = [True] + [False] * len(text)
+    for end in range(1, len(text) + 1):
+        ends[end] = any(ends[start] and any(m(text, start, end) for m in fullmatchers) for start in range(end))
+    return ends[-1]
+
+
+def _branches(seq):
+    """BRANCH items directly in seq or inside plain groups in seq"""
+    for item in seq:
+        name = op_name(item[0])
+        if name == "BRANCH":
+            yield item
+        elif name == "SUBPATTERN":
+            yield from _branches(item[1][3])
+
+
+def check(pattern, flags=0):
+    """Compile pattern, raising UnsafePattern if analyze() finds anything"""
+    findings = analyze(pattern, flags)
+    if findings:
+        raise UnsafePattern(pattern, findings)
+    return re.compile(pattern, flags)
+
+
+if __name__ == "__main__":
+    for pattern in (r"(a+|\w+)*:", r"(a+|\w+)*+:", r"^(\w+\s?)*$", r"\d+\d+x", r"(a+b)+c", r"0*\d{3,}"):
+        print(pattern)
+        for f in analyze(pattern, pump_length=10):
+            print("   ", f.kind, f.span, repr(f.witness))
+    # (a+|\w+)*:
+    #     exponential (0, 9) 'aaaaaaaaaa!'
+    # (a+|\w+)*+:
+    # ^(\w+\s?)*$
+    #     exponential (1, 10) 'aaaaaaaaaa!'
+    # \d+\d+x
+    #     polynomial (0, 6) '0000000000!'
+    # (a+b)+c
+    # 0*\d{3,}
+
+    for pattern in (r"(a|a)*b", r"^(a?){25}a{25}$", r"(a|b|ab)*c", r"(.*a){12}"):
+        print(pattern, [f.message for f in analyze(pattern)])
+    # (a|a)*b ["'(a|a)*' at (0, 6): alternatives inside a repeat can match the same text, exponential backtracking"]
+    # ^(a?){25}a{25}$ ["'(a?){25}' at (1, 9): up to 25 iterations that can match 'a' or nothing, exponential backtracking"]
+    # (a|b|ab)*c ["'(a|b|ab)*' at (0, 9): alternatives inside a repeat can match 'ab' in more than one way, exponential backtracking"]
+    # (.*a){12} ["'(.*a){12}' at (0, 9): repeated part can match runs of 'a' of different lengths, exponential backtracking"]
+
+    try:
+        check(r"(x+x+)+y")
+    except UnsafePattern as e:
+        print(e.findings[0].fragment)
+    # (x+x+)+
@@ -0,0 +1,130 @@
+import re
+
+from literal import literal_text
+
+################
+#   RegexSet   #
+################
+"""
+Test many patterns against a string with
+    any(re.search(p, s) for p in patterns)
+    [i for i, p in enumerate(patterns) if re.search(p, s)]
+but with every pattern compiled once, and patterns without metacharacters
+checked with `in` (same as str.find(), no regex engine involved)
+Literals are tried before the other patterns, so any() and all() usually
+stop on a cheap check: any() at the first pattern found, all() at the
+first one that isn't
+mask() and matches() have to try every pattern, so over the plain loop
+they only gain from the literal checks, benchmark() prints how each
+method compares
+Folding every pattern into one expression with a lookahead each, e.g.
+    (?:(?=[\\s\\S]*?(?:p0)()))?(?:(?=[\\s\\S]*?(?:p1)()))?...
+looks like it should be faster but isn't: each lookahead still scans the
+string on its own, without the literal prefix skipping re does for a
+pattern compiled alone, and nothing can stop early
+"""
+
+
+class RegexSet:
+    def __init__(self, patterns, flags=0):
+        self.patterns = list(patterns)
+        if not self.patterns:
+            raise ValueError("RegexSet needs at least one pattern")
+        self.flags = flags
+        self._literals = []  # (pattern index, literal text)
+        self._searches = []  # (pattern index, compiled pattern .search)
+        for i, pattern in enumerate(self.patterns):
+            compiled = re.compile(pattern, flags)
+            text = None if compiled.flags & re.I else literal_text(compiled)
+            if text is None:
+                self._searches.append((i, compiled.search))
+            else:
+                self._literals.append((i, text))
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def mask(self, string):
+        """Bitmask with bit i set if patterns[i] matches somewhere in string"""
+        bits = 0
+        for i, text in self._literals:
+            if text in string:
+                bits |= 1 << i
+        for i, search in self._searches:
+            if search(string):
+                bits |= 1 << i
+        return bits
+
+    def matches(self, string):
+        """Sorted list of indexes of the patterns that match string"""
+        bits = self.mask(string)
+        return [i for i in range(len(self.patterns)) if bits >> i & 1]
+
+    def any(self, string):
+        for _, text in self._literals:
+            if text in string:
+                return True
+        for _, search in self._searches:
+            if search(string):
+                return True
+        return False
+
+    def all(self, string):
+        for _, text in self._literals:
+            if text not in string:
+                return False
+        for _, search in self._searches:
+            if not search(string):
+                return False
+        return True
+
+    def masks(self, strings):
+        """Yield mask(s) for every string in an iterable"""
+        mask = self.mask
+        for string in strings:
+            yield mask(string)
+
+
+def benchmark(count=200, size=10000, number=20):
+    """Print seconds per call of each RegexSet method vs the plain loop doing the same
+
+    Two sample pattern lists: 200 literals, and 6 mixed patterns
+    """
+    from timeit import timeit
+
+    literals = [f"word{i:03}x" for i in range(count)]
+    mixed = [r"\bat", r"(\w)\1", r"t\b", r"(?i)CAT", r"\d{4}-\d\d", r"error"]
+    text = "the quick brown fox jumps over the lazy dog " * (size // 44)
+    for name, patterns in (("literals", literals), ("mixed", mixed)):
+        rs = RegexSet(patterns)
+        compiled = [re.compile(p) for p in patterns]
+        cases = {
+            "any()": (lambda: any(c.search(text) for c in compiled), lambda: rs.any(text)),
+            "all()": (lambda: all(c.search(text) for c in compiled), lambda: rs.all(text)),
+            "mask()": (
+                lambda: sum(1 << i for i, c in enumerate(compiled) if c.search(text)),
+                lambda: rs.mask(text),
+            ),
+            "matches()": (lambda: [i for i, c in enumerate(compiled) if c.search(text)], lambda: rs.matches(text)),
+        }
+        for label, (loop, method) in cases.items():
+            loop_time = timeit(loop, number=number) / number
+            set_time = timeit(method, number=number) / number
+            print(f"{name:9} {label:10} loop {loop_time:.2e}s  RegexSet {set_time:.2e}s  speedup {loop_time / set_time:5.2f}x")
+
+
+if __name__ == "__main__":
+    items = ["goal", "new", "user", "sit", "eat", "dinner"]
+
+    a_or_w = RegexSet([r"a", r"w"])
+    print([w for w in items if a_or_w.any(w)])
+    # ['goal', 'new', 'eat']
+    e_and_n = RegexSet([r"e", r"n"])
+    print([w for w in items if e_and_n.all(w)])
+    # ['new', 'dinner']
+
+    rules = RegexSet([r"\bat", r"(\w)\1", r"t\b", r"(?i)CAT"])
+    print(rules.matches("cat attempt"))
+    # [0, 1, 2, 3]
+    print([bin(m) for m in rules.masks(["tattle", "rat", "xyz"])])
+    # ['0b10', '0b100', '0b0']
@@ -0,0 +1,63 @@
+import re
+from array import array
+from itertools import chain
+from operator import methodcaller
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+##################
+#   Spans only   #
+##################
+"""
+When only positions are needed, keeping Match objects around costs far
+more memory than the two numbers per match that are actually used
+finditer_spans() stores (start, end) pairs in one flat array("q"):
+    [start0, end0, start1, end1, ...]
+Each Match is dropped as soon as its span is read, and for a single group
+the whole loop runs in C: chain.from_iterable(map(methodcaller("span"), ...))
+Unmatched groups give (-1, -1), same as Match.span()
+"""
+
+
+def finditer_spans(pattern, text, groups=0, pos=0, endpos=None, output="array", flags=0):
+    """Spans of every match of pattern in text
+
+    groups is a group number/name, or a tuple of them
+    output="array" -> flat array("q"), start and end of each group per match
+    output="numpy" -> int64 array of shape (n, 2) for a single group,
+                      or (n, len(groups), 2) for a tuple of groups
+    """
+    pat = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+    if output not in ("array", "numpy"):
+        raise ValueError(f"unknown output: {output!r}")
+    if output == "numpy" and np is None:
+        raise ImportError("output='numpy' requires NumPy")
+
+    matches = pat.finditer(text, pos, len(text) if endpos is None else endpos)
+    if isinstance(groups, tuple):
+        spans = chain.from_iterable(map(lambda m: chain.from_iterable(map(m.span, groups)), matches))
+    else:
+        spans = chain.from_iterable(map(methodcaller("span", groups), matches))
+    result = array("q", spans)
+
+    if output == "numpy":
+        shape = (-1, len(groups), 2) if isinstance(groups, tuple) else (-1, 2)
+        return np.frombuffer(result, dtype=np.int64).reshape(shape)
+    return result
+
+
+if __name__ == "__main__":
+    purchase = "coffee:100g tea:250g sugar:75g chocolate:50g"
+
+    print(finditer_spans(r"\d+", purchase))
+    # array('q', [7, 10, 16, 19, 27, 29, 41, 43])
+    print(finditer_spans(r"(\w+):(\d+)", purchase, groups=(1, 2)))
+    # array('q', [0, 6, 7, 10, 12, 15, 16, 19, 21, 26, 27, 29, 31, 40, 41, 43])
+
+    if np is not None:
+        spans = finditer_spans(r"(?P<item>\w+):(?P<qty>\d+)", purchase, groups="qty", output="numpy")
+        print(spans[:, 1] - spans[:, 0])
+        # [3 3 2 2]
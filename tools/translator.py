@@ -0,0 +1,119 @@
+import re
+
+########################
+#   Dict translation   #
+########################
+"""
+Instead of
+    re.sub(r"1|2|4", lambda m: d[m[0]], s)
+build the pattern from the dict keys and avoid the per match lambda:
+    keys go into a trie, which becomes a regex with shared prefixes
+        cat, car, cart -> (?:ca(?:rt?|t))
+    a longer key is always tried before a key that's a prefix of it,
+    so the longest key wins without having to sort the alternation
+    split() with one capture group gives [text, key, text, key, ..., text]
+    keys are swapped for values with map(dict.__getitem__, ...), which runs
+    in C, then everything is joined once
+"""
+
+
+def _trie_regex(keys):
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        # Returns (regex, whether it is a single atom that ? can apply to)
+        children = [(re.escape(ch), child) for ch, child in sorted(node.items()) if ch]
+        if not children:
+            return "", False
+        if all(list(child) == [""] for _, child in children) and len(children) > 1:
+            body, atom = "[" + "".join(ch for ch, _ in children) + "]", True
+        else:
+            alts = []
+            for ch, child in children:
+                rest, _ = build(child)
+                alts.append(ch + rest)
+            if len(alts) == 1:
+                body, atom = alts[0], len(children[0][0]) == len(alts[0])
+            else:
+                body, atom = "(?:" + "|".join(alts) + ")", True
+        if "" in node:
+            body, atom = (body if atom else "(?:" + body + ")") + "?", True
+        return body, atom
+
+    return build(trie)[0]
+
+
+class Translator:
+    def __init__(self, mapping, whole_words=False, ignore_case=False):
+        if not mapping or any(not k for k in mapping):
+            raise ValueError("mapping must have at least one key, and no empty keys")
+        self.ignore_case = ignore_case
+        if ignore_case:
+            table = {}
+            for key, value in mapping.items():
+                if table.setdefault(key.lower(), value) != value:
+                    raise ValueError(f"keys differ only in case but map to different values: {key!r}")
+            self._table = table
+        else:
+            self._table = dict(mapping)
+
+        body = _trie_regex(self._table)
+        if whole_words:
+            body = r"(?<!\w)(" + body + r")(?!\w)"
+        else:
+            body = "(" + body + ")"
+        self.pattern = re.compile(body, re.I if ignore_case else 0)
+
+    def _lookup(self, keys):
+        if not self.ignore_case:
+            return map(self._table.__getitem__, keys)
+        get = self._table.get
+        values = list(map(get, map(str.lower, keys)))
+        if None in values:
+            # re.I pairs a few non-ASCII characters that str.lower() doesn't,
+            # e.g. the Kelvin sign and k, find those keys the slow way
+            for i, value in enumerate(values):
+                if value is None:
+                    values[i] = next(
+                        v for k, v in self._table.items() if re.fullmatch(re.escape(k), keys[i], re.I)
+                    )
+        return values
+
+    def translaten(self, text):
+        """Return (new text, number of replacements)"""
+        parts = self.pattern.split(text)
+        keys = parts[1::2]
+        parts[1::2] = self._lookup(keys)
+        return "".join(parts), len(keys)
+
+    def translate(self, text):
+        return self.translaten(text)[0]
+
+    __call__ = translate
+
+
+if __name__ == "__main__":
+    d = {"1": "one", "2": "two", "4": "four"}
+    print(Translator(d)("9234012"))
+    # 9two3four0onetwo
+
+    swap = Translator({"tiger": "cat", "cat": "tiger"})
+    print(swap("cat tiger dog tiger cat"))
+    # tiger cat dog cat tiger
+
+    # Longest key wins, no need to order the keys
+    d = {"par": "spar", "spare": "extra", "park": "garden", "spar": "X"}
+    print(Translator(d).translaten("aparkment and a spare, write a parser"))
+    # ('agardenment and a extra, write a sparser', 3)
+
+    words = Translator({"cat": "dog", "par": "spar"}, whole_words=True, ignore_case=True)
+    print(words("Cat scatter CAT par parse"))
+    # dog scatter dog spar parse
+
+    print(_trie_regex(["cat", "car", "cart", "dog"]))
+    # (?:ca(?:rt?|t)|dog)